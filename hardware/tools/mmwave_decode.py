@@ -1,120 +1,248 @@
 """Decode mmWave binary protocol frames from serial or capture files."""
 
 from __future__ import annotations
-import re
+import io
+import os
 import sys
 import json
+import mmap
+import stat
 import argparse
-from typing import Iterable
+import binascii
+from typing import BinaryIO, Callable, Iterable, Iterator
 from pathlib import Path
+from functools import partial
+from itertools import chain
 
 from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_profile.mmwave_protocol import (
+    FrameParser,
     ProtocolError,
     decode_event,
-    decode_frame,
-    extract_encoded_frames,
 )
 
 
+_SERIAL_BUFFER_SIZE = 1 << 16
+_FILE_CHUNK_SIZE = 1 << 20
+_OUTPUT_BUFFER_SIZE = 1 << 16
+_HEX_DIGITS = b"0123456789abcdefABCDEF"
+_NON_HEX = bytes(b for b in range(256) if b not in _HEX_DIGITS)
+# Everything a hex dump may contain: digits, whitespace/comma separators and the x of 0x prefixes.
+_HEX_DUMP_BYTES = _HEX_DIGITS + b" \t\n\r\v\f,xX"
+_SNIFF_BYTES = 4096
+_JSON_ENCODE = json.JSONEncoder(ensure_ascii=True).encode
+
+
 def _looks_like_hex_dump(raw: bytes) -> bool:
-    if not raw:
-        return False
-    if b"\x00" in raw:
-        return False
-    text = raw.decode("utf-8", errors="ignore")
-    tokens = re.findall(r"[0-9A-Fa-f]{2}", text)
-    return len(tokens) >= max(8, len(text.strip().split()) // 2)
+    """Sniff a bounded prefix: a hex dump has nothing left once its own byte classes are deleted."""
+    head = raw[:_SNIFF_BYTES]
+    return bool(head.strip()) and not head.translate(None, _HEX_DUMP_BYTES)
+
+
+def _fmt_targets(event: dict, seq: int) -> str:
+    return f"seq={seq} type=targets n={event['n']} focus={event['focus']} truncated={event['targets_truncated']}"
+
+
+def _fmt_bio(event: dict, seq: int) -> str:
+    return (
+        f"seq={seq} type=bio allowed={event['allowed']} valid={event['valid']} "
+        f"br={event['br']} hr={event['hr']}"
+    )
+
+
+def _fmt_state(event: dict, seq: int) -> str:
+    return (
+        f"seq={seq} type=state state={event['state']} pose={event['pose']} "
+        f"human={event['human']} n_targets={event['n_targets']} dist_cm={event['dist_cm']}"
+    )
+
+
+def _fmt_light(event: dict, seq: int) -> str:
+    return f"seq={seq} type=light valid={event['valid']} lux={event['lux']}"
+
+
+def _fmt_ack(event: dict, seq: int) -> str:
+    return f"seq={seq} type=ack cmd={event['cmd_id']} status={event['status_code']} value={event['value']}"
+
+
+def _fmt_err(event: dict, seq: int) -> str:
+    return f"seq={seq} type=err cmd={event['cmd_id']} err={event['err_code']}"
 
 
-def _parse_hex_dump(raw: bytes) -> bytes:
-    text = raw.decode("utf-8", errors="ignore")
-    tokens = re.findall(r"[0-9A-Fa-f]{2}", text)
-    return bytes(int(token, 16) for token in tokens)
+_FORMATTERS: dict[str, Callable[[dict, int], str]] = {
+    "targets": _fmt_targets,
+    "bio": _fmt_bio,
+    "state": _fmt_state,
+    "light": _fmt_light,
+    "ack": _fmt_ack,
+    "err": _fmt_err,
+}
 
 
 def _format_pretty(event: dict, msg_type: int, seq: int) -> str:
-    evt_type = event.get("type", "unknown")
-    if evt_type == "targets":
-        return (
-            f"seq={seq} type=targets n={event.get('n')} "
-            f"focus={event.get('focus')} truncated={event.get('targets_truncated')}"
-        )
-    if evt_type == "bio":
-        return (
-            f"seq={seq} type=bio allowed={event.get('allowed')} valid={event.get('valid')} "
-            f"br={event.get('br')} hr={event.get('hr')}"
-        )
-    if evt_type == "state":
-        return (
-            f"seq={seq} type=state state={event.get('state')} pose={event.get('pose')} "
-            f"human={event.get('human')} n_targets={event.get('n_targets')} dist_cm={event.get('dist_cm')}"
-        )
-    if evt_type == "light":
-        return f"seq={seq} type=light valid={event.get('valid')} lux={event.get('lux')}"
-    if evt_type == "ack":
-        return f"seq={seq} type=ack cmd={event.get('cmd_id')} status={event.get('status_code')} value={event.get('value')}"
-    if evt_type == "err":
-        return f"seq={seq} type=err cmd={event.get('cmd_id')} err={event.get('err_code')}"
+    formatter = _FORMATTERS.get(event["type"])
+    if formatter is not None:
+        return formatter(event, seq)
     return f"seq={seq} msg_type=0x{msg_type:02X} event={event}"
 
 
-def _emit_event(event: dict, msg_type: int, seq: int, fmt: str) -> None:
+class _TextStdout(io.RawIOBase):
+    """Raw sink for a replaced stdout that only accepts text, such as ``io.StringIO``."""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        sys.stdout.write(bytes(data).decode("utf-8"))
+        return len(data)
+
+    def flush(self) -> None:
+        sys.stdout.flush()
+
+
+def _open_output() -> io.BufferedWriter:
+    """Wrap stdout's binary buffer in a large write buffer; callers flush per input chunk and detach it."""
+    sys.stdout.flush()
+    raw = getattr(sys.stdout, "buffer", None)
+    return io.BufferedWriter(raw if raw is not None else _TextStdout(), buffer_size=_OUTPUT_BUFFER_SIZE)
+
+
+def _emit_event(event: dict, msg_type: int, seq: int, fmt: str, out: BinaryIO) -> None:
     if fmt == "json":
-        print(json.dumps({"seq": seq, "msg_type": msg_type, "event": event}, ensure_ascii=True))
-        return
-    print(_format_pretty(event, msg_type, seq))
+        line = _JSON_ENCODE({"seq": seq, "msg_type": msg_type, "event": event})
+    else:
+        line = _format_pretty(event, msg_type, seq)
+    out.write((line + "\n").encode("utf-8"))
+
+
+def _report_bad_frame(exc: ProtocolError) -> None:
+    print(f"[bad-frame] {exc}", file=sys.stderr)
+
+
+def _make_parser(show_bad_frames: bool) -> FrameParser:
+    return FrameParser(on_error=_report_bad_frame if show_bad_frames else None)
+
 
+def _consume_bytes(parser: FrameParser, data: bytes, fmt: str, show_bad_frames: bool, out: BinaryIO) -> None:
+    for version, msg_type, seq, payload in parser.feed(data):
+        if version != 1:
+            if show_bad_frames:
+                print(f"[bad-frame] unsupported version {version}", file=sys.stderr)
+            continue
 
-def _consume_bytes(buffer: bytearray, data: bytes, fmt: str, show_bad_frames: bool) -> None:
-    buffer.extend(data)
-    for encoded in extract_encoded_frames(buffer):
         try:
-            version, msg_type, seq, payload = decode_frame(encoded)
             event = decode_event(msg_type, payload)
         except ProtocolError as exc:
             if show_bad_frames:
-                print(f"[bad-frame] {exc}", file=sys.stderr)
+                _report_bad_frame(exc)
             continue
+        _emit_event(event, msg_type, seq, fmt, out)
 
-        if version != 1:
-            if show_bad_frames:
-                print(f"[bad-frame] unsupported version {version}", file=sys.stderr)
-            continue
-        _emit_event(event, msg_type, seq, fmt)
+
+def _iter_blocks(mapped: mmap.mmap) -> Iterator[bytes]:
+    """Yield fixed-size blocks, asking the kernel to read the next block ahead while this one is decoded."""
+    size = len(mapped)
+    can_advise = hasattr(mapped, "madvise")
+    if can_advise:
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    for start in range(0, size, _FILE_CHUNK_SIZE):
+        next_start = start + _FILE_CHUNK_SIZE
+        if can_advise and next_start < size:
+            mapped.madvise(mmap.MADV_WILLNEED, next_start, min(_FILE_CHUNK_SIZE, size - next_start))
+        yield mapped[start:next_start]
+
+
+def _hex_digits(text: bytes) -> bytes:
+    """Drop ``0x``/``0X`` prefixes, then whitespace, commas and any other non-hex byte."""
+    return text.replace(b"0x", b"").replace(b"0X", b"").translate(None, _NON_HEX)
 
 
-def _iter_file_chunks(input_file: Path) -> Iterable[bytes]:
-    raw = input_file.read_bytes()
-    if _looks_like_hex_dump(raw):
-        yield _parse_hex_dump(raw)
+def _iter_hex_chunks(blocks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decode hex dump text block by block, carrying an odd trailing nibble into the next one."""
+    held = b""
+    nibble = b""
+    for block in blocks:
+        text = held + block
+        # A trailing "0" may be the start of a "0x" prefix split across blocks.
+        if text.endswith(b"0"):
+            text, held = text[:-1], b"0"
+        else:
+            held = b""
+        digits = nibble + _hex_digits(text)
+        even = len(digits) & ~1
+        nibble = digits[even:]
+        if even:
+            yield binascii.unhexlify(digits[:even])
+    # A final unpaired nibble is dropped.
+    digits = nibble + held
+    if len(digits) > 1:
+        yield binascii.unhexlify(digits[:2])
+
+
+def _iter_decoded_blocks(blocks: Iterator[bytes]) -> Iterator[bytes]:
+    first = next(blocks, None)
+    if first is None:
+        return
+    # The sniff only reads a bounded prefix, so the first block is decoded in a single full pass.
+    if _looks_like_hex_dump(first):
+        yield from _iter_hex_chunks(chain((first,), blocks))
     else:
-        yield raw
+        yield first
+        yield from blocks
 
 
-def _decode_file(input_file: Path, fmt: str, show_bad_frames: bool) -> None:
-    buffer = bytearray()
-    for chunk in _iter_file_chunks(input_file):
-        _consume_bytes(buffer, chunk, fmt, show_bad_frames)
+def _iter_file_chunks(input_file: Path) -> Iterator[bytes]:
+    """Yield decoded capture bytes block by block, letting the OS page the file in on demand."""
+    with open(input_file, "rb") as f:
+        st = os.fstat(f.fileno())
+        if stat.S_ISREG(st.st_mode) and st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield from _iter_decoded_blocks(_iter_blocks(mapped))
+        else:
+            # Pipes and character devices (/dev/stdin, <(...)) cannot be mapped; stream them.
+            yield from _iter_decoded_blocks(iter(partial(f.read, _FILE_CHUNK_SIZE), b""))
 
 
-def _decode_serial(port: str, baud: int, fmt: str, show_bad_frames: bool) -> None:
+def _iter_serial_chunks(port: str, baud: int) -> Iterator[bytes]:
     try:
         import serial
     except ModuleNotFoundError as exc:  # pragma: no cover - runtime environment dependent
         raise SystemExit(f"missing dependency: {exc.name or 'pyserial'}")
 
-    buffer = bytearray()
     with serial.Serial(port, baud, timeout=0.2) as ser:
-        try:
-            while True:
-                waiting = getattr(ser, "in_waiting", 0)
-                read_size = waiting if isinstance(waiting, int) and waiting > 0 else 1
-                chunk = ser.read(read_size)
-                if not chunk:
-                    continue
-                _consume_bytes(buffer, chunk, fmt, show_bad_frames)
-        except KeyboardInterrupt:
-            return
+        # read1() issues at most one large read on the port per call; pyserial returns
+        # once the buffer is filled or the timeout expires, so bytes arrive coalesced.
+        reader = io.BufferedReader(ser, buffer_size=_SERIAL_BUFFER_SIZE)
+        while True:
+            chunk = reader.read1(_SERIAL_BUFFER_SIZE)
+            if chunk:
+                yield chunk
+
+
+def _decode_chunks(chunks: Iterable[bytes], fmt: str, show_bad_frames: bool) -> None:
+    parser = _make_parser(show_bad_frames)
+    out = _open_output()
+    try:
+        for chunk in chunks:
+            _consume_bytes(parser, chunk, fmt, show_bad_frames, out)
+            # One flush per input chunk keeps a live serial tail responsive without
+            # paying a write syscall per event.
+            out.flush()
+            out.raw.flush()
+    finally:
+        # Detach so collecting the wrapper never closes the real stdout.
+        out.flush()
+        out.detach().flush()
+
+
+def _decode_file(input_file: Path, fmt: str, show_bad_frames: bool) -> None:
+    _decode_chunks(_iter_file_chunks(input_file), fmt, show_bad_frames)
+
+
+def _decode_serial(port: str, baud: int, fmt: str, show_bad_frames: bool) -> None:
+    try:
+        _decode_chunks(_iter_serial_chunks(port, baud), fmt, show_bad_frames)
+    except KeyboardInterrupt:
+        return
 
 
 def main() -> int:
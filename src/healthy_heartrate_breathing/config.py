@@ -2,6 +2,7 @@ import os
 import sys
 import logging
 from pathlib import Path
+from functools import lru_cache
 
 from dotenv import find_dotenv, load_dotenv
 
@@ -13,6 +14,9 @@ DEFAULT_PROFILES_DIRECTORY = Path(__file__).parent / "profiles"
 
 logger = logging.getLogger(__name__)
 
+_TRUTHY = frozenset({"1", "true", "yes", "on"})
+_FALSY = frozenset({"0", "false", "no", "off"})
+
 
 def _env_flag(name: str, default: bool = False) -> bool:
     """Parse a boolean environment flag.
@@ -25,32 +29,40 @@ def _env_flag(name: str, default: bool = False) -> bool:
         return default
 
     value = raw.strip().lower()
-    if value in {"1", "true", "yes", "on"}:
+    if value in _TRUTHY:
         return True
-    if value in {"0", "false", "no", "off"}:
+    if value in _FALSY:
         return False
 
     logger.warning("Invalid boolean value for %s=%r, using default=%s", name, raw, default)
     return default
 
 
-def _collect_profile_names(profiles_root: Path) -> set[str]:
+@lru_cache(maxsize=8)
+def _collect_profile_names(profiles_root: Path) -> frozenset[str]:
     """Return profile folder names from a profiles root directory."""
     if not profiles_root.exists() or not profiles_root.is_dir():
-        return set()
-    return {p.name for p in profiles_root.iterdir() if p.is_dir()}
+        return frozenset()
+    return frozenset(p.name for p in profiles_root.iterdir() if p.is_dir())
 
 
-def _collect_tool_module_names(tools_root: Path) -> set[str]:
+@lru_cache(maxsize=8)
+def _collect_tool_module_names(tools_root: Path) -> frozenset[str]:
     """Return tool module names from a tools directory."""
     if not tools_root.exists() or not tools_root.is_dir():
-        return set()
+        return frozenset()
     ignored = {"__init__", "core_tools"}
-    return {
+    return frozenset(
         p.stem
         for p in tools_root.glob("*.py")
         if p.is_file() and p.stem not in ignored
-    }
+    )
+
+
+def _clear_name_caches() -> None:
+    """Forget cached profile/tool directory listings (e.g. after creating files on disk)."""
+    _collect_profile_names.cache_clear()
+    _collect_tool_module_names.cache_clear()
 
 
 def _raise_on_name_collisions(
@@ -58,8 +70,8 @@ def _raise_on_name_collisions(
     label: str,
     external_root: Path,
     internal_root: Path,
-    external_names: set[str],
-    internal_names: set[str],
+    external_names: frozenset[str],
+    internal_names: frozenset[str],
 ) -> None:
     """Raise with a clear message when external/internal names collide."""
     collisions = sorted(external_names & internal_names)
@@ -46,11 +46,12 @@ def run(
     from healthy_heartrate_breathing.moves import MovementManager
     from healthy_heartrate_breathing.console import LocalStream
     from healthy_heartrate_breathing.openai_realtime import OpenaiRealtimeHandler
-    from healthy_heartrate_breathing.tools.core_tools import ToolDependencies
+    from healthy_heartrate_breathing.tools.core_tools import ToolDependencies, initialize_tools
     from healthy_heartrate_breathing.audio.head_wobbler import HeadWobbler
 
     logger = setup_logger(args.debug)
     logger.info("Starting Reachy Mini Conversation App")
+    initialize_tools()
 
     if args.no_camera and args.head_tracker is not None:
         logger.warning(
@@ -4,7 +4,7 @@ import random
 import asyncio
 import logging
 import os
-from typing import Any, Final, Tuple, Literal, Optional
+from typing import Any, Final, Tuple, Literal, Callable, Optional
 from pathlib import Path
 from datetime import datetime
 
@@ -26,6 +26,14 @@ from healthy_heartrate_breathing.tools.core_tools import (
 )
 
 
+_orjson_dumps: Optional[Callable[..., bytes]]
+try:
+    from orjson import OPT_SERIALIZE_NUMPY
+    from orjson import dumps as _orjson_dumps
+except ImportError:
+    _orjson_dumps = None
+
+
 logger = logging.getLogger(__name__)
 
 OPEN_AI_INPUT_SAMPLE_RATE: Final[Literal[24000]] = 24000
@@ -38,19 +46,42 @@ TEXT_INPUT_COST_PER_1M = 4.0
 TEXT_OUTPUT_COST_PER_1M = 16.0
 IMAGE_INPUT_COST_PER_1M = 5.0
 
+# Per-token dollar rates, divided out once instead of per response.
+_AUDIO_INPUT_COST_PER_TOKEN = AUDIO_INPUT_COST_PER_1M / 1e6
+_AUDIO_OUTPUT_COST_PER_TOKEN = AUDIO_OUTPUT_COST_PER_1M / 1e6
+_TEXT_INPUT_COST_PER_TOKEN = TEXT_INPUT_COST_PER_1M / 1e6
+_TEXT_OUTPUT_COST_PER_TOKEN = TEXT_OUTPUT_COST_PER_1M / 1e6
+_IMAGE_INPUT_COST_PER_TOKEN = IMAGE_INPUT_COST_PER_1M / 1e6
+
+# (usage details attribute, ((token count attribute, dollars per token), ...)).
+_TOKEN_RATES: Final = (
+    (
+        "input_token_details",
+        (
+            ("audio_tokens", _AUDIO_INPUT_COST_PER_TOKEN),
+            ("text_tokens", _TEXT_INPUT_COST_PER_TOKEN),
+            ("image_tokens", _IMAGE_INPUT_COST_PER_TOKEN),
+        ),
+    ),
+    (
+        "output_token_details",
+        (
+            ("audio_tokens", _AUDIO_OUTPUT_COST_PER_TOKEN),
+            ("text_tokens", _TEXT_OUTPUT_COST_PER_TOKEN),
+        ),
+    ),
+)
+
 
 def _compute_response_cost(usage: Any) -> float:
     """Compute dollar cost from a response usage object."""
-    inp = getattr(usage, "input_token_details", None)
-    out = getattr(usage, "output_token_details", None)
     cost = 0.0
-    if inp:
-        cost += (getattr(inp, "audio_tokens", 0) or 0) * AUDIO_INPUT_COST_PER_1M / 1e6
-        cost += (getattr(inp, "text_tokens", 0) or 0) * TEXT_INPUT_COST_PER_1M / 1e6
-        cost += (getattr(inp, "image_tokens", 0) or 0) * IMAGE_INPUT_COST_PER_1M / 1e6
-    if out:
-        cost += (getattr(out, "audio_tokens", 0) or 0) * AUDIO_OUTPUT_COST_PER_1M / 1e6
-        cost += (getattr(out, "text_tokens", 0) or 0) * TEXT_OUTPUT_COST_PER_1M / 1e6
+    for details_name, rates in _TOKEN_RATES:
+        details = getattr(usage, details_name, None)
+        if details:
+            for tokens_name, rate in rates:
+                # Missing and None counts both contribute nothing.
+                cost += (getattr(details, tokens_name, 0) or 0) * rate
     return cost
 
 
@@ -62,6 +93,16 @@ def _short_text(value: Any, limit: int = 220) -> str:
     return text[:limit] + "…"
 
 
+def _to_json(value: Any) -> str:
+    """Serialize a tool payload to a JSON string, using orjson when it is installed."""
+    if _orjson_dumps is not None:
+        try:
+            return _orjson_dumps(value, option=OPT_SERIALIZE_NUMPY).decode("utf-8")
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits; json.dumps handles those
+    return json.dumps(value)
+
+
 def _safe_parse_args(args_json: str) -> dict[str, Any]:
     """Parse tool args json and always return an object."""
     try:
@@ -362,6 +403,10 @@ class OpenaiRealtimeHandler(AsyncStreamHandler):
                     delay = base_delay + jitter
                     logger.info("Retrying in %.1f seconds...", delay)
                     await asyncio.sleep(delay)
+                    if self._shutdown_requested:
+                        # shutdown() ran during the backoff; don't open a session nobody will use
+                        logger.info("Shutdown requested during reconnect backoff; not retrying.")
+                        return
                     continue
                 raise
             finally:
@@ -585,7 +630,7 @@ class OpenaiRealtimeHandler(AsyncStreamHandler):
                             idle_args["mode"] = "locate_and_measure"
                             idle_args["duration_s"] = self._idle_mmwave_probe_duration_s
                             idle_args["sweep_if_unseen"] = idle_mmwave_sweep_used
-                            effective_args_json = json.dumps(idle_args)
+                            effective_args_json = _to_json(idle_args)
                             if idle_mmwave_sweep_used:
                                 self._idle_mmwave_last_sweep_time = now
                             logger.info(
@@ -629,13 +674,14 @@ class OpenaiRealtimeHandler(AsyncStreamHandler):
                                 self._idle_mmwave_consecutive_misses,
                             )
 
-                    # send the tool result back
+                    # send the tool result back; serialize once for the model and the UI
+                    tool_result_json = _to_json(tool_result)
                     if isinstance(call_id, str):
                         await self.connection.conversation.item.create(
                             item={
                                 "type": "function_call_output",
                                 "call_id": call_id,
-                                "output": json.dumps(tool_result),
+                                "output": tool_result_json,
                             },
                         )
 
@@ -643,7 +689,7 @@ class OpenaiRealtimeHandler(AsyncStreamHandler):
                         AdditionalOutputs(
                             {
                                 "role": "assistant",
-                                "content": json.dumps(tool_result),
+                                "content": tool_result_json,
                                 "metadata": {"title": f"🛠️ Used tool {tool_name}", "status": "done"},
                             },
                         ),
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 import os
-import glob
 import time
 import asyncio
 import logging
 from typing import Any, Dict, Optional
+from functools import lru_cache
 
 from reachy_mini.utils import create_head_pose
 from healthy_heartrate_breathing.tools.core_tools import Tool, ToolDependencies
@@ -19,18 +19,50 @@ from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_pr
     CMD_SET_TARGETS_MS,
     ProtocolError,
     decode_event,
-    decode_frame,
     encode_frame,
     pack_cmd_set_hm,
     pack_cmd_set_focus,
     pack_cmd_set_bio_ms,
-    extract_encoded_frames,
     pack_cmd_set_targets_ms,
+    extract_and_decode_frames,
 )
 
 
 logger = logging.getLogger(__name__)
 
+_SERIAL_PORT_PREFIXES = ("cu.usbmodem", "tty.usbmodem", "ttyUSB", "ttyACM")
+
+
+def _log_invalid_frame(exc: ProtocolError) -> None:
+    logger.debug("Ignoring invalid frame: %s", exc)
+
+
+@lru_cache(maxsize=1)
+def _discover_serial_port() -> Optional[str]:
+    """Return the first mmWave-looking device in /dev, scanning the directory once per process."""
+    try:
+        with os.scandir("/dev") as entries:
+            names = [entry.name for entry in entries if entry.name.startswith(_SERIAL_PORT_PREFIXES)]
+    except OSError:
+        return None
+    if not names:
+        return None
+    return "/dev/" + min(names)
+
+
+@lru_cache(maxsize=4)
+def _sweep_poses(max_yaw: float) -> tuple[Any, Any, Any]:
+    """Return the (left, center, right) head poses for a yaw sweep, built once per amplitude."""
+    poses = (
+        create_head_pose(0, 0, 0, 0, 0, max_yaw, degrees=False),
+        create_head_pose(0, 0, 0, 0, 0, 0, degrees=False),
+        create_head_pose(0, 0, 0, 0, 0, -max_yaw, degrees=False),
+    )
+    for pose in poses:
+        # Shared between sweeps; moves only read them.
+        pose.setflags(write=False)
+    return poses
+
 
 def _to_ms(value: Any, default: int) -> int:
     """Coerce a positive int and clamp to a minimum of 1."""
@@ -108,15 +140,12 @@ class MmWave(Tool):
         if env_port:
             return env_port
 
-        candidates = sorted(
-            glob.glob("/dev/cu.usbmodem*")
-            + glob.glob("/dev/tty.usbmodem*")
-            + glob.glob("/dev/ttyUSB*")
-            + glob.glob("/dev/ttyACM*")
-        )
-        if not candidates:
+        port = _discover_serial_port()
+        if port is None:
+            # Don't remember a miss; the device may be plugged in before the next call.
+            _discover_serial_port.cache_clear()
             raise RuntimeError("No mmWave serial port found. Set MMWAVE_SERIAL_PORT.")
-        return candidates[0]
+        return port
 
     def _next_tx_seq(self, tx_state: Dict[str, int]) -> int:
         seq = tx_state["seq"]
@@ -130,20 +159,23 @@ class MmWave(Tool):
 
     def _poll_events(self, ser: Any, rx_buffer: bytearray) -> list[Dict[str, Any]]:
         in_waiting = getattr(ser, "in_waiting", 0)
-        read_size = in_waiting if isinstance(in_waiting, int) and in_waiting > 0 else 1
-        chunk = ser.read(read_size)
+        if isinstance(in_waiting, int) and in_waiting > 0:
+            chunk = ser.read(in_waiting)
+        else:
+            # Block (up to the port timeout) for the first byte, then drain whatever
+            # arrived alongside it so the rest of the frame is parsed in this poll.
+            chunk = ser.read(1)
+            if not chunk:
+                return []
+            in_waiting = getattr(ser, "in_waiting", 0)
+            if isinstance(in_waiting, int) and in_waiting > 0:
+                chunk += ser.read(in_waiting)
         if not chunk:
             return []
 
         rx_buffer.extend(chunk)
         events: list[Dict[str, Any]] = []
-        for encoded_frame in extract_encoded_frames(rx_buffer):
-            try:
-                version, msg_type, _seq, payload = decode_frame(encoded_frame)
-            except ProtocolError:
-                logger.debug("Ignoring invalid frame", exc_info=True)
-                continue
-
+        for version, msg_type, _seq, payload in extract_and_decode_frames(rx_buffer, _log_invalid_frame):
             if version != PROTO_VERSION:
                 logger.debug("Ignoring unsupported protocol version: %s", version)
                 continue
@@ -162,24 +194,12 @@ class MmWave(Tool):
         if msg.get("type") != "targets":
             return None
 
-        n_raw = msg.get("n", msg.get("n_targets", 0))
-        try:
-            n = int(n_raw)
-        except (TypeError, ValueError):
-            targets = msg.get("targets")
-            if isinstance(targets, list):
-                n = len(targets)
-            else:
-                n = 0
-
-        if n <= 0:
-            return None
-
         targets = msg.get("targets")
         if not isinstance(targets, list):
             return None
 
-        valid: list[dict[str, Any]] = []
+        best: Optional[Dict[str, Any]] = None
+        best_r = float("inf")
         for item in targets:
             if not isinstance(item, dict):
                 continue
@@ -189,21 +209,19 @@ class MmWave(Tool):
             r = item.get("r")
             if not all(isinstance(v, (int, float)) for v in (x, y, r, cluster)):
                 continue
-            valid.append(
-                {
+            r = float(r)
+            if r < best_r:
+                best_r = r
+                best = {
                     "cluster": int(cluster),
                     "x": float(x),
                     "y": float(y),
-                    "r": float(r),
+                    "r": r,
                     "bearing": float(item.get("bearing", 0.0)),
                     "v": float(item.get("v", 0.0)),
-                },
-            )
-
-        if not valid:
-            return None
+                }
 
-        return min(valid, key=lambda item: item["r"])
+        return best
 
     def _queue_short_sweep(self, deps: ToolDependencies) -> None:
         if deps.movement_manager is None:
@@ -218,9 +236,7 @@ class MmWave(Tool):
             move_s = 1.2
             hold_s = 0.8
 
-            left_pose = create_head_pose(0, 0, 0, 0, 0, max_yaw, degrees=False)
-            center_pose = create_head_pose(0, 0, 0, 0, 0, 0, degrees=False)
-            right_pose = create_head_pose(0, 0, 0, 0, 0, -max_yaw, degrees=False)
+            left_pose, center_pose, right_pose = _sweep_poses(max_yaw)
 
             move_to_left = GotoQueueMove(
                 target_head_pose=left_pose,
@@ -344,9 +360,12 @@ class MmWave(Tool):
                 break
 
         if state["recent_targets"]:
+            seen: set[tuple[Any, ...]] = set()
             unique = []
             for target in state["recent_targets"]:
-                if target not in unique:
+                key = (target["cluster"], target["x"], target["y"], target["r"], target["bearing"], target["v"])
+                if key not in seen:
+                    seen.add(key)
                     unique.append(target)
             state["recent_targets"] = unique
         return state
@@ -498,6 +517,8 @@ class MmWave(Tool):
         try:
             return await asyncio.to_thread(run_session)
         except serial.serialutil.SerialException as e:
+            # The device may have been unplugged or renumbered; rescan /dev next time.
+            _discover_serial_port.cache_clear()
             return {"error": f"serial error on {serial_port}: {e}"}
         except Exception as e:
             logger.exception("mmWave tool failed")
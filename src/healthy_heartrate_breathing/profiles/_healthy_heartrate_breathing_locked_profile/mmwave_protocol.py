@@ -3,7 +3,8 @@
 from __future__ import annotations
 import math
 import struct
-from typing import Any
+import binascii
+from typing import Any, Callable
 
 
 PROTO_VERSION = 1
@@ -57,12 +58,25 @@ POSE_ENUM_TO_NAME = {
 }
 
 
+_PACKET_HEADER_STRUCT = struct.Struct("<BBHH")
+_CRC_STRUCT = struct.Struct("<H")
+_ACK_STRUCT = struct.Struct("<BBi")
+_ERR_STRUCT = struct.Struct("<BB")
+_PONG_STRUCT = struct.Struct("<I")
+_HELLO_STRUCT = struct.Struct("<BH")
+_STATE_STRUCT = struct.Struct("<IBBBBBBH")
+_BIO_STRUCT = struct.Struct("<IBBBBHH")
+_LIGHT_STRUCT = struct.Struct("<IBf")
+_TARGETS_HEADER_STRUCT = struct.Struct("<IhhhhHhhBB")
+_TARGET_STRUCT = struct.Struct("<hhhHhh")
+
+
 class ProtocolError(ValueError):
     """Raised when a frame or payload is invalid."""
 
 
-def crc16_ccitt_false(data: bytes) -> int:
-    """Compute CRC16/CCITT-FALSE."""
+def _crc16_ccitt_false_reference(data: bytes) -> int:
+    """Compute CRC16/CCITT-FALSE bit by bit (reference for the table-driven version)."""
     crc = 0xFFFF
     for byte in data:
         crc ^= byte << 8
@@ -74,37 +88,80 @@ def crc16_ccitt_false(data: bytes) -> int:
     return crc
 
 
-def cobs_encode(data: bytes) -> bytes:
-    """COBS encode payload bytes (delimiter byte excluded)."""
-    if not data:
-        return b"\x01"
+def _crc16_table_entry(index: int) -> int:
+    crc = index << 8
+    for _ in range(8):
+        if crc & 0x8000:
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF
+        else:
+            crc = (crc << 1) & 0xFFFF
+    return crc
 
-    out = bytearray()
-    code_index = 0
-    out.append(0)
-    code = 1
 
+_CRC16_CCITT_TABLE = tuple(_crc16_table_entry(i) for i in range(256))
+
+
+def _crc16_ccitt_false_table(data: bytes | memoryview) -> int:
+    table = _CRC16_CCITT_TABLE
+    crc = 0xFFFF
     for byte in data:
-        if byte == 0:
-            out[code_index] = code
-            code_index = len(out)
-            out.append(0)
-            code = 1
-            continue
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
 
-        out.append(byte)
-        code += 1
-        if code == 0xFF:
-            out[code_index] = code
-            code_index = len(out)
-            out.append(0)
-            code = 1
 
-    out[code_index] = code
+def _crc16_ccitt_false_hqx(data: bytes | memoryview) -> int:
+    # crc_hqx is CRC16/XMODEM (poly 0x1021, no reflection, no final XOR);
+    # seeded with 0xFFFF it is CCITT-FALSE.
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def _select_crc16_backend() -> Callable[[bytes | memoryview], int]:
+    """Pick the fastest available CRC16/CCITT-FALSE implementation.
+
+    Preference order: ``fastcrc`` (optional, native), ``binascii.crc_hqx``,
+    then the pure Python table. Each candidate must reproduce the standard check
+    value before it is used, so a drop-in native backend cannot silently change
+    the wire checksum.
+    """
+    candidates: list[Callable[[bytes | memoryview], int]] = []
+    try:
+        from fastcrc import crc16 as fastcrc16
+    except ImportError:
+        pass
+    else:
+        candidates.append(fastcrc16.ibm_3740)
+    candidates.append(_crc16_ccitt_false_hqx)
+
+    for backend in candidates:
+        if backend(b"123456789") == 0x29B1:
+            return backend
+    return _crc16_ccitt_false_table
+
+
+_crc16_backend = _select_crc16_backend()
+
+
+def crc16_ccitt_false(data: bytes | memoryview) -> int:
+    """Compute CRC16/CCITT-FALSE."""
+    return _crc16_backend(data)
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """COBS encode payload bytes (delimiter byte excluded)."""
+    # bytes.split does the zero scan in C, so the Python loop runs once per zero-free
+    # run (and per 254-byte block) rather than once per byte.
+    out = bytearray()
+    for run in bytes(data).split(b"\x00"):
+        while len(run) >= 0xFE:
+            out.append(0xFF)
+            out += run[:0xFE]
+            run = run[0xFE:]
+        out.append(len(run) + 1)
+        out += run
     return bytes(out)
 
 
-def cobs_decode(encoded: bytes) -> bytes:
+def cobs_decode(encoded: bytes | bytearray | memoryview) -> bytes:
     """COBS decode encoded bytes (without delimiter)."""
     if not encoded:
         raise ProtocolError("empty cobs frame")
@@ -117,13 +174,12 @@ def cobs_decode(encoded: bytes) -> bytes:
         code = encoded[index]
         if code == 0:
             raise ProtocolError("invalid cobs code 0")
-        index += 1
 
-        end = index + code - 1
+        end = index + code
         if end > length:
             raise ProtocolError("cobs code exceeds frame length")
 
-        out.extend(encoded[index:end])
+        out += encoded[index + 1 : end]
         index = end
         if code < 0xFF and index < length:
             out.append(0)
@@ -134,47 +190,120 @@ def cobs_decode(encoded: bytes) -> bytes:
 def encode_frame(msg_type: int, payload: bytes = b"", seq: int = 0, version: int = PROTO_VERSION) -> bytes:
     """Build one framed packet ready to write on serial."""
     payload_len = len(payload)
-    header = struct.pack("<BBHH", version & 0xFF, msg_type & 0xFF, seq & 0xFFFF, payload_len & 0xFFFF)
+    header = _PACKET_HEADER_STRUCT.pack(version & 0xFF, msg_type & 0xFF, seq & 0xFFFF, payload_len & 0xFFFF)
     packet_wo_crc = header + payload
     crc = crc16_ccitt_false(packet_wo_crc)
-    packet = packet_wo_crc + struct.pack("<H", crc)
+    packet = packet_wo_crc + _CRC_STRUCT.pack(crc)
     return cobs_encode(packet) + b"\x00"
 
 
-def decode_frame(encoded_frame: bytes) -> tuple[int, int, int, bytes]:
-    """Decode one framed packet payload (without trailing delimiter)."""
+def _decode_packet(encoded_frame: bytes | bytearray) -> tuple[int, int, int, memoryview]:
+    """Decode one framed packet, returning the payload as a view into the decoded packet."""
     raw = cobs_decode(encoded_frame)
     if len(raw) < 8:
         raise ProtocolError("packet too short")
 
-    version, msg_type, seq, payload_len = struct.unpack_from("<BBHH", raw, 0)
+    version, msg_type, seq, payload_len = _PACKET_HEADER_STRUCT.unpack_from(raw, 0)
     expected_len = 6 + payload_len + 2
     if len(raw) != expected_len:
         raise ProtocolError("payload length mismatch")
 
-    payload = raw[6 : 6 + payload_len]
-    crc_expected = struct.unpack_from("<H", raw, 6 + payload_len)[0]
+    (crc_expected,) = _CRC_STRUCT.unpack_from(raw, 6 + payload_len)
     crc_actual = crc16_ccitt_false(raw[: 6 + payload_len])
     if crc_expected != crc_actual:
         raise ProtocolError("crc mismatch")
 
-    return version, msg_type, seq, payload
+    return version, msg_type, seq, memoryview(raw)[6 : 6 + payload_len]
+
+
+def decode_frame(encoded_frame: bytes) -> tuple[int, int, int, bytes]:
+    """Decode one framed packet payload (without trailing delimiter)."""
+    version, msg_type, seq, payload = _decode_packet(encoded_frame)
+    return version, msg_type, seq, payload.tobytes()
 
 
 def extract_encoded_frames(buffer: bytearray) -> list[bytes]:
     """Extract 0x00-delimited encoded frames from a mutable byte buffer."""
     frames: list[bytes] = []
+    start = 0
+    # Scan with a cursor and drop the consumed prefix once, instead of shifting the
+    # remaining bytes after every frame. The view must be released before the resize.
+    with memoryview(buffer) as view:
+        while True:
+            idx = buffer.find(0, start)
+            if idx < 0:
+                break
+            if idx > start:
+                frames.append(view[start:idx].tobytes())
+            start = idx + 1
+    del buffer[:start]
+    return frames
+
+
+def _decode_delimited(
+    view: bytes | bytearray,
+    on_error: Callable[[ProtocolError], None] | None,
+) -> tuple[list[tuple[int, int, int, memoryview]], int]:
+    """Decode every 0x00-terminated frame in `view`; return the frames and the number of bytes consumed."""
+    frames: list[tuple[int, int, int, memoryview]] = []
+    start = 0
     while True:
-        idx = buffer.find(0)
+        idx = view.find(0, start)
         if idx < 0:
             break
-        frame = bytes(buffer[:idx])
-        del buffer[: idx + 1]
-        if frame:
-            frames.append(frame)
+        frame_start = start
+        start = idx + 1
+        if idx == frame_start:
+            continue
+        try:
+            frames.append(_decode_packet(view[frame_start:idx]))
+        except ProtocolError as exc:
+            if on_error is not None:
+                on_error(exc)
+    return frames, start
+
+
+def extract_and_decode_frames(
+    buffer: bytearray,
+    on_error: Callable[[ProtocolError], None] | None = None,
+) -> list[tuple[int, int, int, memoryview]]:
+    """Decode complete frames from a mutable byte buffer and drop the consumed bytes.
+
+    Returns `(version, msg_type, seq, payload)` tuples where `payload` is a
+    zero-copy view into the decoded packet. Invalid frames are passed to
+    `on_error` and skipped.
+    """
+    frames, consumed = _decode_delimited(buffer, on_error)
+    del buffer[:consumed]
     return frames
 
 
+class FrameParser:
+    """Incremental decoder turning a raw byte stream into decoded frames.
+
+    Incoming chunks are scanned for delimiters from a cursor. When no partial
+    frame is pending the chunk is scanned in place, so only the unterminated
+    tail is ever copied into the internal buffer. Frames that fail to decode are
+    passed to `on_error` and skipped.
+    """
+
+    def __init__(self, on_error: Callable[[ProtocolError], None] | None = None) -> None:
+        """Create an empty parser."""
+        self._pending = bytearray()
+        self._on_error = on_error
+
+    def feed(self, data: bytes) -> list[tuple[int, int, int, memoryview]]:
+        """Consume `data` and return `(version, msg_type, seq, payload)` for each complete frame."""
+        pending = self._pending
+        if pending:
+            pending.extend(data)
+            return extract_and_decode_frames(pending, self._on_error)
+
+        frames, consumed = _decode_delimited(data, self._on_error)
+        pending.extend(data[consumed:])
+        return frames
+
+
 def pack_cmd_set_hm(hm: bool | int) -> bytes:
     """Build payload for CMD_SET_HM."""
     return struct.pack("<B", 1 if hm else 0)
@@ -195,132 +324,159 @@ def pack_cmd_set_targets_ms(ms: int) -> bytes:
     return struct.pack("<H", int(ms) & 0xFFFF)
 
 
-def decode_event(msg_type: int, payload: bytes) -> dict[str, Any]:
-    """Decode payload into a normalized event dictionary."""
-    if msg_type == EVT_ACK:
-        if len(payload) != 6:
-            raise ProtocolError("bad ack payload length")
-        cmd_id, status_code, value = struct.unpack("<BBi", payload)
-        return {"type": "ack", "cmd_id": cmd_id, "status_code": status_code, "value": value}
-
-    if msg_type == EVT_ERR:
-        if len(payload) != 2:
-            raise ProtocolError("bad err payload length")
-        cmd_id, err_code = struct.unpack("<BB", payload)
-        return {"type": "err", "cmd_id": cmd_id, "err_code": err_code}
-
-    if msg_type == EVT_PONG:
-        if len(payload) != 4:
-            raise ProtocolError("bad pong payload length")
-        (t_ms,) = struct.unpack("<I", payload)
-        return {"type": "pong", "t_ms": t_ms}
-
-    if msg_type == EVT_HELLO:
-        if len(payload) != 3:
-            raise ProtocolError("bad hello payload length")
-        proto_version, feature_bits = struct.unpack("<BH", payload)
-        return {"type": "hello", "proto_version": proto_version, "feature_bits": feature_bits}
-
-    if msg_type == EVT_STATE:
-        if len(payload) != 12:
-            raise ProtocolError("bad state payload length")
-        t_ms, state_enum, pose_enum, head_moving, human, n_targets, dist_new, dist_mm = struct.unpack(
-            "<IBBBBBBH", payload
-        )
-        dist_cm = None if dist_mm == 0xFFFF else dist_mm / 10.0
-        return {
-            "type": "state",
-            "t_ms": t_ms,
-            "state": STATE_ENUM_TO_NAME.get(state_enum, f"UNKNOWN_{state_enum}"),
-            "pose": POSE_ENUM_TO_NAME.get(pose_enum, f"UNKNOWN_{pose_enum}"),
-            "head_moving": int(head_moving),
-            "human": int(human),
-            "n_targets": int(n_targets),
-            "dist_cm": dist_cm,
-            "dist_new": int(dist_new),
-        }
-
-    if msg_type == EVT_BIO:
-        if len(payload) != 12:
-            raise ProtocolError("bad bio payload length")
-        t_ms, allowed, valid, br_new, hr_new, br_centi, hr_centi = struct.unpack("<IBBBBHH", payload)
-        br = None if br_centi == 0xFFFF else br_centi / 100.0
-        hr = None if hr_centi == 0xFFFF else hr_centi / 100.0
-        return {
-            "type": "bio",
-            "t_ms": t_ms,
-            "allowed": int(allowed),
-            "valid": int(valid),
-            "br": br,
-            "br_new": int(br_new),
-            "hr": hr,
-            "hr_new": int(hr_new),
-        }
-
-    if msg_type == EVT_LIGHT:
-        if len(payload) != 9:
-            raise ProtocolError("bad light payload length")
-        t_ms, valid, lux = struct.unpack("<IBf", payload)
-        lux_out: float | None
-        if int(valid) == 0 or not math.isfinite(lux):
-            lux_out = None
-        else:
-            lux_out = float(lux)
-        return {
-            "type": "light",
-            "t_ms": t_ms,
-            "valid": int(valid),
-            "lux": lux_out,
+def _decode_ack(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _ACK_STRUCT.size:
+        raise ProtocolError("bad ack payload length")
+    cmd_id, status_code, value = _ACK_STRUCT.unpack(payload)
+    return {"type": "ack", "cmd_id": cmd_id, "status_code": status_code, "value": value}
+
+
+def _decode_err(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _ERR_STRUCT.size:
+        raise ProtocolError("bad err payload length")
+    cmd_id, err_code = _ERR_STRUCT.unpack(payload)
+    return {"type": "err", "cmd_id": cmd_id, "err_code": err_code}
+
+
+def _decode_pong(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _PONG_STRUCT.size:
+        raise ProtocolError("bad pong payload length")
+    (t_ms,) = _PONG_STRUCT.unpack(payload)
+    return {"type": "pong", "t_ms": t_ms}
+
+
+def _decode_hello(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _HELLO_STRUCT.size:
+        raise ProtocolError("bad hello payload length")
+    proto_version, feature_bits = _HELLO_STRUCT.unpack(payload)
+    return {"type": "hello", "proto_version": proto_version, "feature_bits": feature_bits}
+
+
+def _decode_state(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _STATE_STRUCT.size:
+        raise ProtocolError("bad state payload length")
+    t_ms, state_enum, pose_enum, head_moving, human, n_targets, dist_new, dist_mm = _STATE_STRUCT.unpack(payload)
+    dist_cm = None if dist_mm == 0xFFFF else dist_mm / 10.0
+    return {
+        "type": "state",
+        "t_ms": t_ms,
+        "state": STATE_ENUM_TO_NAME.get(state_enum, f"UNKNOWN_{state_enum}"),
+        "pose": POSE_ENUM_TO_NAME.get(pose_enum, f"UNKNOWN_{pose_enum}"),
+        "head_moving": int(head_moving),
+        "human": int(human),
+        "n_targets": int(n_targets),
+        "dist_cm": dist_cm,
+        "dist_new": int(dist_new),
+    }
+
+
+def _decode_bio(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _BIO_STRUCT.size:
+        raise ProtocolError("bad bio payload length")
+    t_ms, allowed, valid, br_new, hr_new, br_centi, hr_centi = _BIO_STRUCT.unpack(payload)
+    br = None if br_centi == 0xFFFF else br_centi / 100.0
+    hr = None if hr_centi == 0xFFFF else hr_centi / 100.0
+    return {
+        "type": "bio",
+        "t_ms": t_ms,
+        "allowed": int(allowed),
+        "valid": int(valid),
+        "br": br,
+        "br_new": int(br_new),
+        "hr": hr,
+        "hr_new": int(hr_new),
+    }
+
+
+def _decode_light(payload: bytes | memoryview) -> dict[str, Any]:
+    if len(payload) != _LIGHT_STRUCT.size:
+        raise ProtocolError("bad light payload length")
+    t_ms, valid, lux = _LIGHT_STRUCT.unpack(payload)
+    lux_out: float | None
+    if int(valid) == 0 or not math.isfinite(lux):
+        lux_out = None
+    else:
+        lux_out = float(lux)
+    return {
+        "type": "light",
+        "t_ms": t_ms,
+        "valid": int(valid),
+        "lux": lux_out,
+    }
+
+
+def _decode_targets(payload: bytes | memoryview) -> dict[str, Any]:
+    header_len = _TARGETS_HEADER_STRUCT.size
+    target_len = _TARGET_STRUCT.size
+    if len(payload) < header_len:
+        raise ProtocolError("bad targets payload length")
+    (
+        t_ms,
+        forced_focus,
+        focus_cluster,
+        focus_x_mm,
+        focus_y_mm,
+        focus_r_mm,
+        focus_bearing_cdeg,
+        focus_v_x10,
+        flags,
+        n_targets,
+    ) = _TARGETS_HEADER_STRUCT.unpack_from(payload, 0)
+    expected_len = header_len + int(n_targets) * target_len
+    if len(payload) != expected_len:
+        raise ProtocolError("targets payload length mismatch")
+
+    focus = None
+    if flags & FLAG_FOCUS_VALID:
+        focus = {
+            "cluster": int(focus_cluster),
+            "x": focus_x_mm / 1000.0,
+            "y": focus_y_mm / 1000.0,
+            "r": focus_r_mm / 1000.0,
+            "bearing": focus_bearing_cdeg / 100.0,
+            "v": focus_v_x10 / 10.0,
         }
 
-    if msg_type == EVT_TARGETS:
-        header_len = 20
-        target_len = 12
-        if len(payload) < header_len:
-            raise ProtocolError("bad targets payload length")
-        t_ms, forced_focus, focus_cluster, focus_x_mm, focus_y_mm, focus_r_mm, focus_bearing_cdeg, focus_v_x10, flags, n_targets = struct.unpack(
-            "<IhhhhHhhBB", payload[:header_len]
-        )
-        expected_len = header_len + int(n_targets) * target_len
-        if len(payload) != expected_len:
-            raise ProtocolError("targets payload length mismatch")
-
-        focus = None
-        if flags & FLAG_FOCUS_VALID:
-            focus = {
-                "cluster": int(focus_cluster),
-                "x": focus_x_mm / 1000.0,
-                "y": focus_y_mm / 1000.0,
-                "r": focus_r_mm / 1000.0,
-                "bearing": focus_bearing_cdeg / 100.0,
-                "v": focus_v_x10 / 10.0,
+    targets = []
+    for cluster, x_mm, y_mm, r_mm, bearing_cdeg, v_x10 in _TARGET_STRUCT.iter_unpack(payload[header_len:]):
+        targets.append(
+            {
+                "cluster": int(cluster),
+                "x": x_mm / 1000.0,
+                "y": y_mm / 1000.0,
+                "r": r_mm / 1000.0,
+                "bearing": bearing_cdeg / 100.0,
+                "v": v_x10 / 10.0,
             }
+        )
+
+    return {
+        "type": "targets",
+        "t_ms": t_ms,
+        "n": int(n_targets),
+        "n_targets": int(n_targets),
+        "forced_focus": int(forced_focus),
+        "focus": focus,
+        "targets": targets,
+        "targets_truncated": bool(flags & FLAG_TARGETS_TRUNCATED),
+    }
+
+
+_EVENT_DECODERS: dict[int, Callable[[bytes | memoryview], dict[str, Any]]] = {
+    EVT_ACK: _decode_ack,
+    EVT_ERR: _decode_err,
+    EVT_PONG: _decode_pong,
+    EVT_HELLO: _decode_hello,
+    EVT_STATE: _decode_state,
+    EVT_BIO: _decode_bio,
+    EVT_LIGHT: _decode_light,
+    EVT_TARGETS: _decode_targets,
+}
 
-        targets = []
-        offset = header_len
-        for _ in range(int(n_targets)):
-            cluster, x_mm, y_mm, r_mm, bearing_cdeg, v_x10 = struct.unpack("<hhhHhh", payload[offset : offset + target_len])
-            offset += target_len
-            targets.append(
-                {
-                    "cluster": int(cluster),
-                    "x": x_mm / 1000.0,
-                    "y": y_mm / 1000.0,
-                    "r": r_mm / 1000.0,
-                    "bearing": bearing_cdeg / 100.0,
-                    "v": v_x10 / 10.0,
-                }
-            )
-
-        return {
-            "type": "targets",
-            "t_ms": t_ms,
-            "n": int(n_targets),
-            "n_targets": int(n_targets),
-            "forced_focus": int(forced_focus),
-            "focus": focus,
-            "targets": targets,
-            "targets_truncated": bool(flags & FLAG_TARGETS_TRUNCATED),
-        }
 
-    return {"type": "unknown", "msg_type": msg_type, "payload": payload}
+def decode_event(msg_type: int, payload: bytes | memoryview) -> dict[str, Any]:
+    """Decode payload into a normalized event dictionary."""
+    decoder = _EVENT_DECODERS.get(msg_type)
+    if decoder is None:
+        return {"type": "unknown", "msg_type": msg_type, "payload": bytes(payload)}
+    return decoder(payload)
@@ -1,25 +1,35 @@
 from __future__ import annotations
-import re
+import os
 import abc
 import sys
-import json
-import inspect
 import logging
+import weakref
 import importlib
 import importlib.util
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Callable, Iterable
 from pathlib import Path
 from dataclasses import dataclass
 
-from reachy_mini import ReachyMini
 from healthy_heartrate_breathing.config import DEFAULT_PROFILES_DIRECTORY as DEFAULT_PROFILES_PATH  # noqa: F401
 from healthy_heartrate_breathing.config import config
 
 
+if TYPE_CHECKING:
+    from reachy_mini import ReachyMini
+
+
+_json_loads: Callable[[str | bytes], Any]
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
 logger = logging.getLogger(__name__)
 
 
 DEFAULT_PROFILES_MODULE = "healthy_heartrate_breathing.profiles"
+_DEFAULT_TOOLS_TXT = DEFAULT_PROFILES_PATH / "default" / "tools.txt"
 
 
 if not logger.handlers:
@@ -30,20 +40,33 @@ if not logger.handlers:
     logger.setLevel(logging.INFO)
 
 
-ALL_TOOLS: Dict[str, "Tool"] = {}
-ALL_TOOL_SPECS: List[Dict[str, Any]] = []
+# Bound by initialize_tools(); module __getattr__ initializes them on first access.
+ALL_TOOLS: Dict[str, "Tool"]
+ALL_TOOL_SPECS: List[Dict[str, Any]]
 _TOOLS_INITIALIZED = False
+_TOOLS_TXT_CACHE: Dict[tuple[Path, str], Path] = {}
+# Modules loaded from external files, and tool classes from such modules purged by reset_registry().
+_FILE_LOADED_MODULES: set[str] = set()
+_RETIRED_TOOL_CLASSES: weakref.WeakSet[type[Tool]] = weakref.WeakSet()
 
 
 
 def get_concrete_subclasses(base: type[Tool]) -> List[type[Tool]]:
-    """Recursively find all concrete (non-abstract) subclasses of a base class."""
+    """Find all concrete (non-abstract) subclasses of a base class, each listed once."""
     result: List[type[Tool]] = []
-    for cls in base.__subclasses__():
-        if not inspect.isabstract(cls):
+    seen: set[type[Tool]] = set()
+    # Depth-first, pre-order (same order as a recursive walk); reversed pushes keep
+    # siblings in definition order.
+    stack = base.__subclasses__()[::-1]
+    while stack:
+        cls = stack.pop()
+        if cls in seen:
+            continue
+        seen.add(cls)
+        # ABCMeta fills __abstractmethods__; an empty set means the class is concrete.
+        if not getattr(cls, "__abstractmethods__", None):
             result.append(cls)
-        # recurse into subclasses
-        result.extend(get_concrete_subclasses(cls))
+        stack.extend(cls.__subclasses__()[::-1])
     return result
 
 
@@ -90,7 +113,11 @@ class Tool(abc.ABC):
 
 
 def _load_module_from_file(module_name: str, file_path: Path) -> None:
-    """Load a Python module from a file path."""
+    """Load a Python module from a file path, reusing it if that file is already loaded."""
+    _FILE_LOADED_MODULES.add(module_name)
+    cached = sys.modules.get(module_name)
+    if cached is not None and getattr(cached, "__file__", None) == os.fspath(file_path):
+        return
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     if not (spec and spec.loader):
         raise ModuleNotFoundError(f"Cannot create spec for {file_path}")
@@ -99,23 +126,41 @@ def _load_module_from_file(module_name: str, file_path: Path) -> None:
     spec.loader.exec_module(module)
 
 
+def _list_python_files(directory: Path) -> frozenset[str]:
+    """Return the names of ``*.py`` files in a directory from a single scandir pass."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries if entry.name.endswith(".py") and entry.is_file())
+    except OSError:
+        return frozenset()
+
+
 def _try_load_tool(
     tool_name: str,
     module_path: str,
-    fallback_directory: Path | None,
+    fallback_directory: str | None,
     file_subpath: str,
+    fallback_listing: frozenset[str] | None = None,
 ) -> str:
-    """Try to load a tool: first via importlib, then from file if fallback is configured."""
+    """Try to load a tool: first via importlib, then from file if fallback is configured.
+
+    When ``fallback_listing`` (file names in ``fallback_directory``) is given, it is
+    used instead of stat-ing the candidate file.
+    """
     try:
         importlib.import_module(module_path)
         return "module"
     except ModuleNotFoundError:
         if fallback_directory is None:
             raise
-        tool_file = fallback_directory / file_subpath
-        if not tool_file.exists():
+        tool_file = os.path.join(fallback_directory, file_subpath)
+        if fallback_listing is not None:
+            found = file_subpath in fallback_listing
+        else:
+            found = os.path.isfile(tool_file)
+        if not found:
             raise FileNotFoundError(f"tool file not found at {tool_file}")
-        _load_module_from_file(tool_name, tool_file)
+        _load_module_from_file(tool_name, Path(tool_file))
         return "file"
 
 
@@ -130,18 +175,20 @@ def _format_error(error: Exception) -> str:
     return f"{type(error).__name__}: {error}"
 
 
-# Registry & specs (dynamic)
-def _load_profile_tools() -> None:
-    """Load tools based on profile's tools.txt file."""
-    # Determine which profile to use
-    profile = config.REACHY_MINI_CUSTOM_PROFILE or "default"
-    logger.info(f"Loading tools for profile: {profile}")
+def _resolve_tools_txt(profile: str) -> Path:
+    """Return the tools.txt to use for a profile, falling back to the default profile's.
+
+    Resolutions are cached per profiles directory, so re-initialization skips the stat calls.
+    """
+    key = (config.PROFILES_DIRECTORY, profile)
+    cached = _TOOLS_TXT_CACHE.get(key)
+    if cached is not None:
+        return cached
 
-    # Build path to tools.txt
     # Get the profile directory path
     profile_module_path = config.PROFILES_DIRECTORY / profile
     tools_txt_path = profile_module_path / "tools.txt"
-    default_tools_txt_path = Path(__file__).parent.parent / "profiles" / "default" / "tools.txt"
+    default_tools_txt_path = _DEFAULT_TOOLS_TXT
 
     if config.PROFILES_DIRECTORY != DEFAULT_PROFILES_PATH:
         logger.info(
@@ -160,36 +207,51 @@ def _load_profile_tools() -> None:
             )
             tools_txt_path = default_tools_txt_path
         else:
-            logger.error(f"✗ tools.txt not found at {tools_txt_path}")
+            logger.error("✗ tools.txt not found at %s", tools_txt_path)
             sys.exit(1)
 
+    _TOOLS_TXT_CACHE[key] = tools_txt_path
+    return tools_txt_path
+
+
+# Registry & specs (dynamic)
+def _load_profile_tools() -> None:
+    """Load tools based on profile's tools.txt file."""
+    # Determine which profile to use
+    profile = config.REACHY_MINI_CUSTOM_PROFILE or "default"
+    logger.info("Loading tools for profile: %s", profile)
+
+    tools_txt_path = _resolve_tools_txt(profile)
+
     # Read and parse tools.txt
     try:
-        with open(tools_txt_path, "r") as f:
-            lines = f.readlines()
+        raw = tools_txt_path.read_text(encoding="utf-8")
     except Exception as e:
-        logger.error(f"✗ Failed to read tools.txt: {e}")
+        logger.error("✗ Failed to read tools.txt: %s", e)
         sys.exit(1)
 
     # Parse tool names (skip comments and blank lines)
-    tool_names = []
-    for line in lines:
-        line = line.strip()
-        # Skip blank lines and comments
-        if not line or line.startswith("#"):
-            continue
-        tool_names.append(line)
+    tool_names = [line for line in map(str.strip, raw.splitlines()) if line and not line.startswith("#")]
+
+    logger.info("Found %d tools to load: %s", len(tool_names), tool_names)
 
-    logger.info(f"Found {len(tool_names)} tools to load: {tool_names}")
+    # Plain strings keep per-candidate path joins off pathlib.
+    profiles_directory = os.fspath(config.PROFILES_DIRECTORY)
+    tools_directory: str | None = None
+    external_tool_files: frozenset[str] | None = None
+    if config.TOOLS_DIRECTORY is not None:
+        tools_directory = os.fspath(config.TOOLS_DIRECTORY)
+        external_tool_files = _list_python_files(config.TOOLS_DIRECTORY)
 
-    if config.AUTOLOAD_EXTERNAL_TOOLS and config.TOOLS_DIRECTORY and config.TOOLS_DIRECTORY.is_dir():
+    if config.AUTOLOAD_EXTERNAL_TOOLS and external_tool_files:
         discovered_external_tools: List[str] = []
-        for tool_file in sorted(config.TOOLS_DIRECTORY.glob("*.py")):
-            if tool_file.name.startswith("_"):
+        for file_name in sorted(external_tool_files):
+            if file_name.startswith("_"):
                 continue
-            candidate_name = tool_file.stem
-            if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", candidate_name):
-                logger.warning("Skipping external tool with invalid name: %s", tool_file.name)
+            candidate_name = file_name[: -len(".py")]
+            # ASCII identifiers are exactly [A-Za-z_][A-Za-z0-9_]*.
+            if not (candidate_name.isascii() and candidate_name.isidentifier()):
+                logger.warning("Skipping external tool with invalid name: %s", file_name)
                 continue
             discovered_external_tools.append(candidate_name)
 
@@ -212,7 +274,7 @@ def _load_profile_tools() -> None:
             source = _try_load_tool(
                 tool_name,
                 module_path=profile_import_path,
-                fallback_directory=config.PROFILES_DIRECTORY,
+                fallback_directory=profiles_directory,
                 file_subpath=f"{profile}/{tool_name}.py",
             )
             if source == "file":
@@ -223,12 +285,12 @@ def _load_profile_tools() -> None:
         except (ModuleNotFoundError, FileNotFoundError) as e:
             if tool_name not in str(e):
                 profile_error = _format_error(e)
-                logger.error(f"❌ Failed to load profile tool '{tool_name}': {profile_error}")
-                logger.error(f"  Module path: {profile_import_path}")
+                logger.error("❌ Failed to load profile tool '%s': %s", tool_name, profile_error)
+                logger.error("  Module path: %s", profile_import_path)
         except Exception as e:
             profile_error = _format_error(e)
-            logger.error(f"❌ Failed to load profile tool '{tool_name}': {profile_error}")
-            logger.error(f"  Module path: {profile_import_path}")
+            logger.error("❌ Failed to load profile tool '%s': %s", tool_name, profile_error)
+            logger.error("  Module path: %s", profile_import_path)
 
         # Try tools directory if not found in profile
         if not loaded:
@@ -237,8 +299,9 @@ def _load_profile_tools() -> None:
                 source = _try_load_tool(
                     tool_name,
                     module_path=shared_module_path,
-                    fallback_directory=config.TOOLS_DIRECTORY,
+                    fallback_directory=tools_directory,
                     file_subpath=f"{tool_name}.py",
+                    fallback_listing=external_tool_files,
                 )
                 if source == "file":
                     logger.info("✓ Loaded external tool: %s", tool_name)
@@ -246,17 +309,17 @@ def _load_profile_tools() -> None:
                     logger.info("✓ Loaded core tool: %s", tool_name)
             except (ModuleNotFoundError, FileNotFoundError):
                 if profile_error:
-                    logger.error(f"❌ Tool '{tool_name}' also not found in shared tools")
+                    logger.error("❌ Tool '%s' also not found in shared tools", tool_name)
                 else:
-                    logger.warning(f"⚠️ Tool '{tool_name}' not found in profile or shared tools")
+                    logger.warning("⚠️ Tool '%s' not found in profile or shared tools", tool_name)
             except Exception as e:
-                logger.error(f"❌ Failed to load shared tool '{tool_name}': {_format_error(e)}")
-                logger.error(f"  Module path: {shared_module_path}")
+                logger.error("❌ Failed to load shared tool '%s': %s", tool_name, _format_error(e))
+                logger.error("  Module path: %s", shared_module_path)
 
 
 
-def _initialize_tools() -> None:
-    """Populate registry once, even if module is imported repeatedly."""
+def initialize_tools() -> None:
+    """Populate registry once; the app entry point calls this, other access initializes lazily."""
     global ALL_TOOLS, ALL_TOOL_SPECS, _TOOLS_INITIALIZED
 
     if _TOOLS_INITIALIZED:
@@ -265,27 +328,69 @@ def _initialize_tools() -> None:
 
     _load_profile_tools()
 
-    ALL_TOOLS = {cls.name: cls() for cls in get_concrete_subclasses(Tool)}  # type: ignore[type-abstract]
-    ALL_TOOL_SPECS = [tool.spec() for tool in ALL_TOOLS.values()]
-
+    ALL_TOOLS = {
+        cls.name: cls()
+        for cls in get_concrete_subclasses(Tool)  # type: ignore[type-abstract]
+        if cls not in _RETIRED_TOOL_CLASSES
+    }
+    ALL_TOOL_SPECS = []
+    # One pass collects both the specs and the batched registration listing.
+    log_registrations = logger.isEnabledFor(logging.INFO)
+    lines: List[str] = []
     for tool_name, tool in ALL_TOOLS.items():
-        logger.info(f"tool registered: {tool_name} - {tool.description}")
+        ALL_TOOL_SPECS.append(tool.spec())
+        if log_registrations:
+            lines.append(f"  - {tool_name}: {tool.description}")
+    if log_registrations:
+        logger.info("Registered %d tools:\n%s", len(ALL_TOOLS), "\n".join(lines))
 
     _TOOLS_INITIALIZED = True
 
 
-_initialize_tools()
-
+def reset_registry() -> None:
+    """Forget the registry, tools.txt resolutions and file-loaded tool modules.
 
-def get_tool_specs(exclusion_list: list[str] = []) -> list[Dict[str, Any]]:
-    """Get tool specs, optionally excluding some tools."""
-    return [spec for spec in ALL_TOOL_SPECS if spec.get("name") not in exclusion_list]
+    The next access re-runs initialize_tools() for the current config. Tools loaded from
+    external files are dropped from ``sys.modules`` and never registered again unless
+    reloaded; tools imported as packages stay imported.
+    """
+    global _TOOLS_INITIALIZED
+    _TOOLS_INITIALIZED = False
+    _TOOLS_TXT_CACHE.clear()
+    globals().pop("ALL_TOOLS", None)
+    globals().pop("ALL_TOOL_SPECS", None)
+    for cls in get_concrete_subclasses(Tool):  # type: ignore[type-abstract]
+        if cls.__module__ in _FILE_LOADED_MODULES:
+            _RETIRED_TOOL_CLASSES.add(cls)
+    for module_name in _FILE_LOADED_MODULES:
+        sys.modules.pop(module_name, None)
+    _FILE_LOADED_MODULES.clear()
+
+
+def __getattr__(name: str) -> Any:
+    if name in ("ALL_TOOLS", "ALL_TOOL_SPECS"):
+        initialize_tools()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def get_tool_specs(exclusion_list: Iterable[str] = ()) -> list[Dict[str, Any]]:
+    """Get tool specs, optionally excluding some tools.
+
+    With no exclusions the shared registry list is returned; treat it as read-only.
+    """
+    if not _TOOLS_INITIALIZED:
+        initialize_tools()
+    if not exclusion_list:
+        return ALL_TOOL_SPECS
+    excluded = frozenset(exclusion_list)
+    return [spec for spec in ALL_TOOL_SPECS if spec.get("name") not in excluded]
 
 
 # Dispatcher
 def _safe_load_obj(args_json: str) -> Dict[str, Any]:
     try:
-        parsed_args = json.loads(args_json or "{}")
+        parsed_args = _json_loads(args_json or "{}")
         return parsed_args if isinstance(parsed_args, dict) else {}
     except Exception:
         logger.warning("bad args_json=%r", args_json)
@@ -294,6 +399,8 @@ def _safe_load_obj(args_json: str) -> Dict[str, Any]:
 
 async def dispatch_tool_call(tool_name: str, args_json: str, deps: ToolDependencies) -> Dict[str, Any]:
     """Dispatch a tool call by name with JSON args and dependencies."""
+    if not _TOOLS_INITIALIZED:
+        initialize_tools()
     tool = ALL_TOOLS.get(tool_name)
 
     if not tool:
@@ -48,3 +48,22 @@ def test_config_raises_when_selected_external_profile_is_missing(
 
     with pytest.raises(RuntimeError, match="Selected profile 'missing_profile' was not found"):
         config_mod.Config()
+
+
+def test_config_rescans_tool_directory_after_cache_clear(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Directory listings are cached until explicitly cleared."""
+    external_tools = tmp_path / "external_tools"
+    external_tools.mkdir(parents=True)
+
+    monkeypatch.setattr(config_mod.Config, "PROFILES_DIRECTORY", config_mod.DEFAULT_PROFILES_DIRECTORY)
+    monkeypatch.setattr(config_mod.Config, "TOOLS_DIRECTORY", external_tools)
+    config_mod.Config()
+
+    (external_tools / "dance.py").write_text("# collision with built-in dance tool\n", encoding="utf-8")
+    config_mod.Config()
+
+    config_mod._clear_name_caches()
+    with pytest.raises(RuntimeError, match="Ambiguous tool names"):
+        config_mod.Config()
@@ -1,5 +1,5 @@
+import abc
 import sys
-import importlib
 from types import ModuleType
 from pathlib import Path
 
@@ -8,17 +8,13 @@ import pytest
 import healthy_heartrate_breathing.config as config_mod
 
 
-def _reload_core_tools() -> ModuleType:
-    """Reload core_tools after config object has been patched."""
-    for module_name in list(sys.modules):
-        if module_name.startswith("healthy_heartrate_breathing.tools."):
-            sys.modules.pop(module_name, None)
-    # External file-loaded modules are registered by bare tool name.
-    sys.modules.pop("ext_ping", None)
+def _reset_core_tools() -> ModuleType:
+    """Rebuild the core_tools registry after config object has been patched."""
+    from healthy_heartrate_breathing.tools import core_tools
 
-    sys.modules.pop("healthy_heartrate_breathing.tools.core_tools", None)
-    core_tools_mod = importlib.import_module("healthy_heartrate_breathing.tools.core_tools")
-    return core_tools_mod
+    core_tools.reset_registry()
+    core_tools.initialize_tools()
+    return core_tools
 
 
 def test_external_profile_can_use_builtin_tools(
@@ -37,7 +33,7 @@ def test_external_profile_can_use_builtin_tools(
     monkeypatch.setattr(config_mod.config, "TOOLS_DIRECTORY", None)
     monkeypatch.setattr(config_mod.config, "AUTOLOAD_EXTERNAL_TOOLS", False)
 
-    core_tools_mod = _reload_core_tools()
+    core_tools_mod = _reset_core_tools()
 
     assert "dance" in core_tools_mod.ALL_TOOLS
 
@@ -73,6 +69,106 @@ def test_external_tools_can_be_loaded_without_external_profile(
     monkeypatch.setattr(config_mod.config, "TOOLS_DIRECTORY", external_tools_root)
     monkeypatch.setattr(config_mod.config, "AUTOLOAD_EXTERNAL_TOOLS", True)
 
-    core_tools_mod = _reload_core_tools()
+    core_tools_mod = _reset_core_tools()
 
     assert "ext_ping" in core_tools_mod.ALL_TOOLS
+
+
+def test_reset_registry_drops_tools_loaded_under_previous_config(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A file-loaded tool registered under one config is gone after a reset under another."""
+    profile_name = "ext_profile_reset_test"
+    external_profiles_root = tmp_path / "external_profiles"
+    profile_dir = external_profiles_root / profile_name
+    profile_dir.mkdir(parents=True)
+    (profile_dir / "instructions.txt").write_text("hello\n", encoding="utf-8")
+    (profile_dir / "tools.txt").write_text("dance\n", encoding="utf-8")
+
+    external_tools_root = tmp_path / "external_tools"
+    external_tools_root.mkdir(parents=True)
+    (external_tools_root / "ext_reset_ping.py").write_text(
+        "\n".join(
+            [
+                "from typing import Any, Dict",
+                "from healthy_heartrate_breathing.tools.core_tools import Tool, ToolDependencies",
+                "",
+                "class ExtResetPingTool(Tool):",
+                "    name = \"ext_reset_ping\"",
+                "    description = \"External ping tool\"",
+                "    parameters_schema = {\"type\": \"object\", \"properties\": {}, \"required\": []}",
+                "",
+                "    async def __call__(self, deps: ToolDependencies, **kwargs: Any) -> Dict[str, Any]:",
+                "        return {\"status\": \"ok\"}",
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    monkeypatch.setattr(config_mod.config, "REACHY_MINI_CUSTOM_PROFILE", profile_name)
+    monkeypatch.setattr(config_mod.config, "PROFILES_DIRECTORY", external_profiles_root)
+    monkeypatch.setattr(config_mod.config, "TOOLS_DIRECTORY", external_tools_root)
+    monkeypatch.setattr(config_mod.config, "AUTOLOAD_EXTERNAL_TOOLS", True)
+    assert "ext_reset_ping" in _reset_core_tools().ALL_TOOLS
+
+    monkeypatch.setattr(config_mod.config, "TOOLS_DIRECTORY", None)
+    monkeypatch.setattr(config_mod.config, "AUTOLOAD_EXTERNAL_TOOLS", False)
+    core_tools_mod = _reset_core_tools()
+
+    assert "ext_reset_ping" not in core_tools_mod.ALL_TOOLS
+    assert "ext_reset_ping" not in sys.modules
+    assert "dance" in core_tools_mod.ALL_TOOLS
+
+
+def test_get_concrete_subclasses_lists_each_class_once_in_definition_order() -> None:
+    """Diamond hierarchies are walked depth-first without duplicates."""
+    from healthy_heartrate_breathing.tools.core_tools import get_concrete_subclasses
+
+    class Base(abc.ABC):
+        @abc.abstractmethod
+        def run(self) -> None: ...
+
+    class Left(Base):
+        def run(self) -> None: ...
+
+    class Right(Base):
+        def run(self) -> None: ...
+
+    class Both(Left, Right):
+        pass
+
+    class AbstractLeaf(Right):
+        @abc.abstractmethod
+        def extra(self) -> None: ...
+
+    assert get_concrete_subclasses(Base) == [Left, Both, Right]  # type: ignore[arg-type]
+
+
+def test_get_tool_specs_filters_excluded_names() -> None:
+    """Exclusions drop matching specs; no exclusions returns every spec."""
+    from healthy_heartrate_breathing.tools import core_tools
+
+    names = [spec["name"] for spec in core_tools.get_tool_specs()]
+    assert names == [spec["name"] for spec in core_tools.ALL_TOOL_SPECS]
+
+    excluded = names[:1]
+    remaining = [spec["name"] for spec in core_tools.get_tool_specs(excluded)]
+    assert remaining == names[1:]
+
+
+def test_load_module_from_file_reuses_already_loaded_file(tmp_path: Path) -> None:
+    """Loading the same file under the same name twice executes it only once."""
+    from healthy_heartrate_breathing.tools.core_tools import _load_module_from_file
+
+    module_file = tmp_path / "ext_counter.py"
+    module_file.write_text("loaded = object()\n")
+    try:
+        _load_module_from_file("ext_counter", module_file)
+        first = sys.modules["ext_counter"]
+        marker = first.loaded
+        _load_module_from_file("ext_counter", module_file)
+        assert sys.modules["ext_counter"] is first
+        assert first.loaded is marker
+    finally:
+        sys.modules.pop("ext_counter", None)
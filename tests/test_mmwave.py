@@ -6,34 +6,52 @@ import sys
 import types
 import struct
 from types import SimpleNamespace
-from typing import Any
+from typing import Any, Iterator
+from collections import deque
 
 import pytest
 
 from healthy_heartrate_breathing.tools.core_tools import ToolDependencies
-from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_profile.mmWave import MmWave
+from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_profile.mmWave import (
+    MmWave,
+    _discover_serial_port,
+)
 from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_profile.mmwave_protocol import (
     EVT_BIO,
     EVT_PONG,
     EVT_LIGHT,
     EVT_STATE,
     CMD_SET_HM,
+    _BIO_STRUCT,
     ERR_BAD_LEN,
     EVT_TARGETS,
+    _LIGHT_STRUCT,
+    _STATE_STRUCT,
     CMD_SET_FOCUS,
     PROTO_VERSION,
+    _TARGET_STRUCT,
     CMD_SET_BIO_MS,
     CMD_SET_TARGETS_MS,
+    _TARGETS_HEADER_STRUCT,
+    FrameParser,
     ProtocolError,
     cobs_encode,
     decode_event,
     decode_frame,
     encode_frame,
     crc16_ccitt_false,
+    _crc16_ccitt_false_hqx,
     extract_encoded_frames,
+    _crc16_ccitt_false_table,
+    extract_and_decode_frames,
+    _crc16_ccitt_false_reference,
 )
 
 
+# Targets header followed by exactly one target entry, packed in one call.
+_SINGLE_TARGET_STRUCT = struct.Struct(_TARGETS_HEADER_STRUCT.format + _TARGET_STRUCT.format.lstrip("<"))
+
+
 def _pack_state(
     *,
     t_ms: int,
@@ -45,8 +63,7 @@ def _pack_state(
     dist_new: int,
     dist_mm: int,
 ) -> bytes:
-    return struct.pack(
-        "<IBBBBBBH",
+    return _STATE_STRUCT.pack(
         t_ms,
         state_enum,
         pose_enum,
@@ -59,7 +76,7 @@ def _pack_state(
 
 
 def _pack_bio(*, t_ms: int, allowed: int, valid: int, br_new: int, hr_new: int, br_centi: int, hr_centi: int) -> bytes:
-    return struct.pack("<IBBBBHH", t_ms, allowed, valid, br_new, hr_new, br_centi, hr_centi)
+    return _BIO_STRUCT.pack(t_ms, allowed, valid, br_new, hr_new, br_centi, hr_centi)
 
 
 def _pack_targets_single(
@@ -77,8 +94,7 @@ def _pack_targets_single(
     flags = 0x01
     if truncated:
         flags |= 0x02
-    header = struct.pack(
-        "<IhhhhHhhBB",
+    return _SINGLE_TARGET_STRUCT.pack(
         t_ms,
         forced_focus,
         cluster,
@@ -89,13 +105,17 @@ def _pack_targets_single(
         v_x10,
         flags,
         1,
+        cluster,
+        x_mm,
+        y_mm,
+        r_mm,
+        bearing_cdeg,
+        v_x10,
     )
-    target = struct.pack("<hhhHhh", cluster, x_mm, y_mm, r_mm, bearing_cdeg, v_x10)
-    return header + target
 
 
 def _pack_light(*, t_ms: int, valid: int, lux: float) -> bytes:
-    return struct.pack("<IBf", t_ms, valid, lux)
+    return _LIGHT_STRUCT.pack(t_ms, valid, lux)
 
 
 class FakeSerial:
@@ -104,8 +124,9 @@ class FakeSerial:
     class SerialException(Exception):
         """Fake serial exception type."""
 
-    response_batches: list[dict[str, Any]] = []
-    instances: list["FakeSerial"] = []
+    response_batches: deque[dict[str, Any]] = deque()
+    # Most recently opened port; the tool opens one per call, so this is the test's port.
+    current: "FakeSerial | None" = None
 
     def __init__(
         self,
@@ -119,21 +140,23 @@ class FakeSerial:
         self.baudrate = _baud
         self.timeout = timeout
         if responses is not None:
-            self._buffer = bytearray(responses)
+            self._buffer = bytes(responses)
             self._read_chunk_size = read_chunk_size
         elif FakeSerial.response_batches:
-            config = FakeSerial.response_batches.pop(0)
-            self._buffer = bytearray(config.get("bytes", b""))
+            config = FakeSerial.response_batches.popleft()
+            self._buffer = bytes(config.get("bytes", b""))
             self._read_chunk_size = config.get("read_chunk_size")
         else:
-            self._buffer = bytearray()
+            self._buffer = b""
             self._read_chunk_size = None
+        # Read cursor into the immutable buffer; reads never shift the remaining bytes.
+        self._pos = 0
         self.writes: list[bytes] = []
-        FakeSerial.instances.append(self)
+        FakeSerial.current = self
 
     @property
     def in_waiting(self) -> int:
-        return len(self._buffer)
+        return len(self._buffer) - self._pos
 
     def write(self, data: bytes) -> None:
         self.writes.append(bytes(data))
@@ -142,13 +165,11 @@ class FakeSerial:
         return None
 
     def read(self, size: int = 1) -> bytes:
-        if not self._buffer:
-            return b""
-        n = min(size, len(self._buffer))
+        n = min(size, len(self._buffer) - self._pos)
         if self._read_chunk_size is not None:
             n = min(n, self._read_chunk_size)
-        out = bytes(self._buffer[:n])
-        del self._buffer[:n]
+        out = self._buffer[self._pos : self._pos + n]
+        self._pos += n
         return out
 
     def close(self) -> None:
@@ -161,21 +182,24 @@ class FakeSerial:
         return False
 
 
-def _patch_serial_modules(
-    monkeypatch: pytest.MonkeyPatch,
-    responses_batches: list[dict[str, Any]],
-) -> None:
-    FakeSerial.response_batches = list(responses_batches)
-    FakeSerial.instances = []
-
+@pytest.fixture(scope="module", autouse=True)
+def _install_fake_serial() -> Iterator[None]:
     serial_module = types.ModuleType("serial")
     serialutil_module = types.ModuleType("serial.serialutil")
     serialutil_module.SerialException = FakeSerial.SerialException
     serial_module.Serial = FakeSerial
     serial_module.serialutil = serialutil_module
 
-    monkeypatch.setitem(sys.modules, "serial", serial_module)
-    monkeypatch.setitem(sys.modules, "serial.serialutil", serialutil_module)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setitem(sys.modules, "serial", serial_module)
+        monkeypatch.setitem(sys.modules, "serial.serialutil", serialutil_module)
+        yield
+    FakeSerial.current = None
+
+
+def _patch_serial_modules(responses_batches: list[dict[str, Any]]) -> None:
+    FakeSerial.response_batches = deque(responses_batches)
+    FakeSerial.current = None
 
 
 def _deps() -> ToolDependencies:
@@ -220,6 +244,46 @@ def test_frame_roundtrip_and_cobs_extraction() -> None:
     assert decode_event(msg_type_2, payload_2)["state"] == "PRESENT_FAR"
 
 
+def test_frame_parser_decodes_split_stream_and_reports_bad_frames() -> None:
+    errors: list[ProtocolError] = []
+    parser = FrameParser(on_error=errors.append)
+    good = encode_frame(EVT_PONG, b"\x00\x01\x02\x00", seq=7)
+    bad = bytearray(encode_frame(EVT_PONG, b"\x05\x06\x07\x08", seq=8))
+    bad[-3] ^= 0x11
+    stream = good + bytes(bad) + good
+
+    decoded = []
+    for start in range(0, len(stream), 5):
+        decoded.extend(parser.feed(stream[start : start + 5]))
+
+    assert decoded == [(PROTO_VERSION, EVT_PONG, 7, b"\x00\x01\x02\x00")] * 2
+    assert len(errors) == 1
+
+
+def test_extract_and_decode_frames_keeps_unterminated_tail() -> None:
+    frame = encode_frame(EVT_PONG, b"\x10\x00\x00\x00", seq=3)
+    buffer = bytearray(frame + frame[:4])
+
+    decoded = extract_and_decode_frames(buffer)
+
+    assert [(v, mt, seq, bytes(payload)) for v, mt, seq, payload in decoded] == [
+        (PROTO_VERSION, EVT_PONG, 3, b"\x10\x00\x00\x00")
+    ]
+    assert decode_event(EVT_PONG, decoded[0][3])["t_ms"] == 16
+    assert buffer == frame[:4]
+
+
+def test_crc16_implementations_match_reference() -> None:
+    assert crc16_ccitt_false(b"123456789") == 0x29B1
+    assert crc16_ccitt_false(b"") == 0xFFFF
+    data = bytes(range(256)) * 3
+    for end in (1, 7, 64, len(data)):
+        expected = _crc16_ccitt_false_reference(data[:end])
+        assert crc16_ccitt_false(data[:end]) == expected
+        assert _crc16_ccitt_false_hqx(data[:end]) == expected
+        assert _crc16_ccitt_false_table(data[:end]) == expected
+
+
 def test_decode_frame_rejects_bad_length() -> None:
     raw = struct.pack("<BBHH", PROTO_VERSION, EVT_BIO, 1, 30) + b"\x01\x02"
     crc = crc16_ccitt_false(raw)
@@ -243,20 +307,22 @@ def test_bio_null_sentinel_decodes_to_none() -> None:
     assert event["hr"] is None
 
 
-def test_light_valid_decodes_float_lux() -> None:
-    payload = _pack_light(t_ms=456, valid=1, lux=123.45)
-    event = decode_event(EVT_LIGHT, payload)
-    assert event["type"] == "light"
-    assert event["valid"] == 1
-    assert event["lux"] == pytest.approx(123.45, rel=1e-6)
-
-
-def test_light_invalid_nan_decodes_to_none() -> None:
-    payload = _pack_light(t_ms=789, valid=0, lux=float("nan"))
-    event = decode_event(EVT_LIGHT, payload)
+@pytest.mark.parametrize(
+    ("t_ms", "valid", "lux", "expected_lux"),
+    [
+        pytest.param(456, 1, 123.45, pytest.approx(123.45, rel=1e-6), id="valid-float"),
+        pytest.param(789, 0, float("nan"), None, id="invalid-nan"),
+    ],
+)
+def test_light_decodes_lux(t_ms: int, valid: int, lux: float, expected_lux: Any) -> None:
+    event = decode_event(EVT_LIGHT, _pack_light(t_ms=t_ms, valid=valid, lux=lux))
     assert event["type"] == "light"
-    assert event["valid"] == 0
-    assert event["lux"] is None
+    assert event["t_ms"] == t_ms
+    assert event["valid"] == valid
+    if expected_lux is None:
+        assert event["lux"] is None
+    else:
+        assert event["lux"] == expected_lux
 
 
 def test_light_bad_payload_len_raises_protocol_error() -> None:
@@ -264,11 +330,25 @@ def test_light_bad_payload_len_raises_protocol_error() -> None:
         decode_event(EVT_LIGHT, b"\x01\x02")
 
 
+def test_targets_event_decodes_every_target() -> None:
+    header = _TARGETS_HEADER_STRUCT.pack(500, -1, 0, 0, 0, 0, 0, 0, 0, 2)
+    targets = _TARGET_STRUCT.pack(1, 100, 1000, 1005, 100, 5) + _TARGET_STRUCT.pack(2, -200, 400, 447, -2650, -3)
+    event = decode_event(EVT_TARGETS, memoryview(header + targets))
+
+    assert event["n"] == 2
+    assert event["focus"] is None
+    assert [t["cluster"] for t in event["targets"]] == [1, 2]
+    assert event["targets"][1] == {"cluster": 2, "x": -0.2, "y": 0.4, "r": 0.447, "bearing": -26.5, "v": -0.3}
+
+    with pytest.raises(ProtocolError):
+        decode_event(EVT_TARGETS, header + targets[:-1])
+
+
 @pytest.mark.asyncio
-async def test_measure_mode_sends_binary_commands_and_parses_bio(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_measure_mode_sends_binary_commands_and_parses_bio() -> None:
     bio_payload = _pack_bio(t_ms=100, allowed=1, valid=1, br_new=1, hr_new=1, br_centi=1240, hr_centi=6900)
     responses = encode_frame(EVT_BIO, bio_payload, seq=1)
-    _patch_serial_modules(monkeypatch, [{"bytes": responses}])
+    _patch_serial_modules([{"bytes": responses}])
 
     tool = MmWave()
     response = await tool(_deps(), mode="measure", focus_cluster=4, duration_s=0.1)
@@ -277,14 +357,15 @@ async def test_measure_mode_sends_binary_commands_and_parses_bio(monkeypatch: py
     assert response["measure"]["valid_bio"]["heart_rate_bpm"] == 69.0
     assert response["measure"]["valid_bio"]["breath_rate_bpm"] == 12.4
 
-    serial = FakeSerial.instances[0]
+    serial = FakeSerial.current
+    assert serial is not None
     sent = _decode_written_frames(serial)
     msg_types = [msg_type for _version, msg_type, _seq, _payload in sent]
     assert msg_types[:3] == [CMD_SET_FOCUS, CMD_SET_HM, CMD_SET_BIO_MS]
 
 
 @pytest.mark.asyncio
-async def test_locate_and_measure_partial_read_and_focus_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_locate_and_measure_partial_read_and_focus_lock() -> None:
     targets_payload = _pack_targets_single(
         t_ms=35093,
         forced_focus=-1,
@@ -298,7 +379,7 @@ async def test_locate_and_measure_partial_read_and_focus_lock(monkeypatch: pytes
     bio_payload = _pack_bio(t_ms=35996, allowed=1, valid=1, br_new=1, hr_new=1, br_centi=1310, hr_centi=7000)
 
     stream = encode_frame(EVT_TARGETS, targets_payload, seq=2) + encode_frame(EVT_BIO, bio_payload, seq=3)
-    _patch_serial_modules(monkeypatch, [{"bytes": stream, "read_chunk_size": 3}])
+    _patch_serial_modules([{"bytes": stream, "read_chunk_size": 3}])
 
     tool = MmWave()
     response = await tool(
@@ -312,7 +393,8 @@ async def test_locate_and_measure_partial_read_and_focus_lock(monkeypatch: pytes
     assert response["status"] == "ok"
     assert response["scan"]["latest_target"]["cluster"] == 7
 
-    serial = FakeSerial.instances[0]
+    serial = FakeSerial.current
+    assert serial is not None
     sent = _decode_written_frames(serial)
     msg_types = [msg_type for _version, msg_type, _seq, _payload in sent]
     assert msg_types[0:2] == [CMD_SET_HM, CMD_SET_TARGETS_MS]
@@ -320,13 +402,13 @@ async def test_locate_and_measure_partial_read_and_focus_lock(monkeypatch: pytes
 
 
 @pytest.mark.asyncio
-async def test_resync_after_corrupted_frame(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_resync_after_corrupted_frame() -> None:
     bad_frame = bytearray(encode_frame(EVT_STATE, _pack_state(t_ms=10, state_enum=2, pose_enum=1, head_moving=0, human=1, n_targets=1, dist_new=1, dist_mm=350), seq=10))
     bad_frame[-3] ^= 0x11  # break crc while keeping delimiter
 
     good_bio = encode_frame(EVT_BIO, _pack_bio(t_ms=20, allowed=1, valid=1, br_new=1, hr_new=1, br_centi=1400, hr_centi=7900), seq=11)
     stream = bytes(bad_frame) + good_bio
-    _patch_serial_modules(monkeypatch, [{"bytes": stream}])
+    _patch_serial_modules([{"bytes": stream}])
 
     tool = MmWave()
     response = await tool(_deps(), mode="measure", duration_s=0.1)
@@ -336,7 +418,7 @@ async def test_resync_after_corrupted_frame(monkeypatch: pytest.MonkeyPatch) ->
 
 
 @pytest.mark.asyncio
-async def test_unsupported_version_frame_is_ignored(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_unsupported_version_frame_is_ignored() -> None:
     bad_version = encode_frame(
         EVT_BIO,
         _pack_bio(t_ms=30, allowed=1, valid=1, br_new=1, hr_new=1, br_centi=1200, hr_centi=6800),
@@ -348,7 +430,7 @@ async def test_unsupported_version_frame_is_ignored(monkeypatch: pytest.MonkeyPa
         _pack_bio(t_ms=31, allowed=1, valid=1, br_new=1, hr_new=1, br_centi=1210, hr_centi=6810),
         seq=13,
     )
-    _patch_serial_modules(monkeypatch, [{"bytes": bad_version + good_version}])
+    _patch_serial_modules([{"bytes": bad_version + good_version}])
 
     tool = MmWave()
     response = await tool(_deps(), mode="measure", duration_s=0.1)
@@ -358,7 +440,7 @@ async def test_unsupported_version_frame_is_ignored(monkeypatch: pytest.MonkeyPa
 
 
 @pytest.mark.asyncio
-async def test_locate_and_measure_ignores_light_event_in_mixed_stream(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_locate_and_measure_ignores_light_event_in_mixed_stream() -> None:
     targets_payload = _pack_targets_single(
         t_ms=1000,
         forced_focus=-1,
@@ -376,7 +458,7 @@ async def test_locate_and_measure_ignores_light_event_in_mixed_stream(monkeypatc
         + encode_frame(EVT_LIGHT, light_payload, seq=101)
         + encode_frame(EVT_BIO, bio_payload, seq=102)
     )
-    _patch_serial_modules(monkeypatch, [{"bytes": stream, "read_chunk_size": 4}])
+    _patch_serial_modules([{"bytes": stream, "read_chunk_size": 4}])
 
     tool = MmWave()
     response = await tool(
@@ -394,7 +476,7 @@ async def test_locate_and_measure_ignores_light_event_in_mixed_stream(monkeypatc
 
 
 @pytest.mark.asyncio
-async def test_locate_and_measure_with_full_mixed_stream(monkeypatch: pytest.MonkeyPatch) -> None:
+async def test_locate_and_measure_with_full_mixed_stream() -> None:
     stream = b"".join(
         [
             encode_frame(
@@ -522,7 +604,7 @@ async def test_locate_and_measure_with_full_mixed_stream(monkeypatch: pytest.Mon
             encode_frame(EVT_BIO, _pack_bio(t_ms=37004, allowed=1, valid=0, br_new=1, hr_new=0, br_centi=1000, hr_centi=7600), seq=38),
         ]
     )
-    _patch_serial_modules(monkeypatch, [{"bytes": stream, "read_chunk_size": 7}])
+    _patch_serial_modules([{"bytes": stream, "read_chunk_size": 7}])
 
     tool = MmWave()
     response = await tool(
@@ -540,6 +622,105 @@ async def test_locate_and_measure_with_full_mixed_stream(monkeypatch: pytest.Mon
     assert response["measure"]["valid_bio"]["heart_rate_bpm"] == 79.0
 
 
+@pytest.mark.asyncio
+async def test_scan_deduplicates_recent_targets() -> None:
+    def targets_frame(seq: int, cluster: int, x_mm: int) -> bytes:
+        payload = _pack_targets_single(
+            t_ms=seq * 100,
+            forced_focus=-1,
+            cluster=cluster,
+            x_mm=x_mm,
+            y_mm=500,
+            r_mm=510,
+            bearing_cdeg=0,
+            v_x10=0,
+        )
+        return encode_frame(EVT_TARGETS, payload, seq=seq)
+
+    stream = targets_frame(1, 2, 100) + targets_frame(2, 2, 100) + targets_frame(3, 5, -40) + targets_frame(4, 2, 100)
+    _patch_serial_modules([{"bytes": stream}])
+
+    tool = MmWave()
+    response = await tool(_deps(), mode="scan", duration_s=0.1, sweep_if_unseen=False)
+
+    assert response["scan"]["targets_seen"] == 4
+    assert [t["cluster"] for t in response["scan"]["recent_targets"]] == [2, 5]
+
+
+def test_resolve_serial_port_scans_dev_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    listing = ["ttyS0", "ttyUSB1", "ttyACM0", "cu.usbmodem12", "tty.usbmodem12"]
+    scans: list[str] = []
+
+    class _Entries:
+        def __init__(self, path: str) -> None:
+            scans.append(path)
+
+        def __enter__(self) -> Any:
+            return iter([SimpleNamespace(name=name) for name in listing])
+
+        def __exit__(self, *_exc_info: object) -> bool:
+            return False
+
+    monkeypatch.delenv("MMWAVE_SERIAL_PORT", raising=False)
+    monkeypatch.setattr("os.scandir", _Entries)
+    _discover_serial_port.cache_clear()
+    tool = MmWave()
+
+    assert tool._resolve_serial_port(None) == "/dev/cu.usbmodem12"
+    assert tool._resolve_serial_port(None) == "/dev/cu.usbmodem12"
+    assert scans == ["/dev"]
+
+    listing[:] = ["ttyS0"]
+    _discover_serial_port.cache_clear()
+    with pytest.raises(RuntimeError, match="No mmWave serial port found"):
+        tool._resolve_serial_port(None)
+    listing.append("ttyACM3")
+    assert tool._resolve_serial_port(None) == "/dev/ttyACM3"
+    _discover_serial_port.cache_clear()
+
+
+def test_pick_target_returns_nearest_valid_target() -> None:
+    msg = {
+        "type": "targets",
+        "n": 4,
+        "targets": [
+            {"cluster": 1, "x": 0.1, "y": 1.0, "r": 1.005},
+            "garbage",
+            {"cluster": 2, "x": -0.2, "y": 0.4, "r": None},
+            {"cluster": 3, "x": 0.0, "y": 0.5, "r": 0.5, "bearing": 2.5, "v": -0.1},
+        ],
+    }
+
+    best = MmWave()._pick_target_from_message(msg)
+
+    assert best == {"cluster": 3, "x": 0.0, "y": 0.5, "r": 0.5, "bearing": 2.5, "v": -0.1}
+    assert MmWave()._pick_target_from_message({"type": "targets", "n": 0, "targets": []}) is None
+
+
+def test_short_sweep_reuses_cached_poses() -> None:
+    queued: list[Any] = []
+    movement_manager = SimpleNamespace(
+        clear_move_queue=lambda: queued.clear(),
+        queue_move=queued.append,
+        set_moving_state=lambda _duration: None,
+    )
+    reachy_mini = SimpleNamespace(
+        get_current_head_pose=lambda: None,
+        get_current_joint_positions=lambda: ([0.0], [0.0, 0.0]),
+    )
+    deps = ToolDependencies(reachy_mini=reachy_mini, movement_manager=movement_manager)
+    tool = MmWave()
+
+    tool._queue_short_sweep(deps)
+    first = [move.target_head_pose for move in queued]
+    tool._queue_short_sweep(deps)
+    second = [move.target_head_pose for move in queued]
+
+    assert len(second) == 6
+    assert all(a is b for a, b in zip(first, second))
+    assert not second[0].flags.writeable
+
+
 @pytest.mark.asyncio
 async def test_invalid_mode_returns_error() -> None:
     tool = MmWave()
@@ -549,3 +730,11 @@ async def test_invalid_mode_returns_error() -> None:
 
 def test_bad_len_error_code_constant_is_stable() -> None:
     assert ERR_BAD_LEN == 2
+
+
+def test_struct_layouts_match_wire_sizes() -> None:
+    assert _TARGETS_HEADER_STRUCT.size == 20
+    assert _TARGET_STRUCT.size == 12
+    assert _STATE_STRUCT.size == 12
+    assert _BIO_STRUCT.size == 12
+    assert _LIGHT_STRUCT.size == 9
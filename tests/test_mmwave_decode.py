@@ -0,0 +1,138 @@
+"""Tests for the mmWave capture decoding CLI."""
+# ruff: noqa: D103
+
+from __future__ import annotations
+import io
+import os
+import json
+import mmap
+import importlib.util
+from types import ModuleType
+from typing import Callable
+from pathlib import Path
+from threading import Thread
+from contextlib import redirect_stdout
+
+import pytest
+
+from healthy_heartrate_breathing.profiles._healthy_heartrate_breathing_locked_profile.mmwave_protocol import (
+    EVT_LIGHT,
+    _LIGHT_STRUCT,
+    encode_frame,
+)
+
+
+_DECODE_SCRIPT = Path(__file__).resolve().parents[1] / "hardware" / "tools" / "mmwave_decode.py"
+
+
+@pytest.fixture(scope="module")
+def mmwave_decode() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("mmwave_decode", _DECODE_SCRIPT)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _light_frame(seq: int) -> bytes:
+    return encode_frame(EVT_LIGHT, _LIGHT_STRUCT.pack(1000 + seq, 1, 42.0), seq=seq)
+
+
+def _read_capture(module: ModuleType, path: Path) -> bytes:
+    return b"".join(module._iter_file_chunks(path))
+
+
+_DUMP_LAYOUTS = [
+    pytest.param(lambda data: data.hex(), id="contiguous"),
+    pytest.param(lambda data: data.hex("\n", 30), id="xxd-p"),
+    pytest.param(lambda data: data.hex(" "), id="spaced"),
+    pytest.param(lambda data: data.hex(" ", 2), id="grouped"),
+    pytest.param(lambda data: ", ".join(f"0x{byte:02X}" for byte in data), id="0x-prefixed"),
+    pytest.param(lambda data: ",".join(f"0x{byte:02x}" for byte in data), id="0x-prefixed-compact"),
+]
+
+
+@pytest.mark.parametrize("render", _DUMP_LAYOUTS)
+def test_hex_dump_capture_decodes_to_frame_bytes(
+    mmwave_decode: ModuleType, tmp_path: Path, render: Callable[[bytes], str]
+) -> None:
+    frame = _light_frame(7)
+    capture = tmp_path / "capture.txt"
+    capture.write_text(render(frame) + "\n")
+    assert _read_capture(mmwave_decode, capture) == frame
+
+
+@pytest.mark.parametrize("render", _DUMP_LAYOUTS)
+def test_hex_chunks_decode_every_dump_layout(mmwave_decode: ModuleType, render: Callable[[bytes], str]) -> None:
+    frames = b"".join(_light_frame(seq) for seq in range(3))
+    text = render(frames).encode()
+    # Split at every offset so odd nibbles and "0x" prefixes straddle block boundaries.
+    for split in range(1, len(text)):
+        blocks = [text[:split], text[split:]]
+        assert b"".join(mmwave_decode._iter_hex_chunks(blocks)) == frames
+
+
+def test_hex_token_split_across_blocks_is_carried(
+    mmwave_decode: ModuleType, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    frames = b"".join(_light_frame(seq) for seq in range(256))
+    capture = tmp_path / "capture.txt"
+    capture.write_text(", ".join(f"0x{byte:02x}" for byte in frames))
+    # Page-sized blocks do not line up with the 6-byte "0x??, " tokens.
+    monkeypatch.setattr(mmwave_decode, "_FILE_CHUNK_SIZE", mmap.PAGESIZE)
+    assert _read_capture(mmwave_decode, capture) == frames
+
+
+def test_labelled_hex_dump_is_not_sniffed_as_hex_dump(mmwave_decode: ModuleType, tmp_path: Path) -> None:
+    text = b"Frame 1 data: 04 01 83 00 2a\nbad\n"
+    capture = tmp_path / "capture.txt"
+    capture.write_bytes(text)
+    assert _read_capture(mmwave_decode, capture) == text
+
+
+def test_ascii_text_is_not_sniffed_as_hex_dump(mmwave_decode: ModuleType, tmp_path: Path) -> None:
+    # Plenty of hex letters, but no whole two-digit tokens.
+    text = b"Bad feed: faded decade, accessed cafe beef dab\n" * 4
+    capture = tmp_path / "capture.txt"
+    capture.write_bytes(text)
+    assert _read_capture(mmwave_decode, capture) == text
+
+
+@pytest.mark.parametrize("as_hex", [pytest.param(False, id="raw"), pytest.param(True, id="hex")])
+def test_fifo_capture_is_streamed(mmwave_decode: ModuleType, tmp_path: Path, as_hex: bool) -> None:
+    frames = b"".join(_light_frame(seq) for seq in range(8))
+    payload = frames.hex(" ").encode() if as_hex else frames
+    fifo = tmp_path / "capture.fifo"
+    os.mkfifo(fifo)
+
+    def feed() -> None:
+        with open(fifo, "wb") as writer:
+            writer.write(payload)
+
+    feeder = Thread(target=feed)
+    feeder.start()
+    try:
+        assert _read_capture(mmwave_decode, fifo) == frames
+    finally:
+        feeder.join()
+
+
+def test_decode_file_writes_through_replaced_stdout(mmwave_decode: ModuleType, tmp_path: Path) -> None:
+    capture = tmp_path / "capture.bin"
+    capture.write_bytes(_light_frame(3))
+    out = io.StringIO()
+    with redirect_stdout(out):
+        mmwave_decode._decode_file(capture, "pretty", False)
+    assert out.getvalue() == "seq=3 type=light valid=1 lux=42.0\n"
+
+
+def test_decode_file_leaves_stdout_open(
+    mmwave_decode: ModuleType, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    capture = tmp_path / "capture.bin"
+    capture.write_bytes(_light_frame(1) + _light_frame(2))
+    mmwave_decode._decode_file(capture, "json", False)
+    print("done")
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["seq"] for line in lines[:-1]] == [1, 2]
+    assert lines[-1] == "done"
@@ -1,13 +1,15 @@
+import json
 import asyncio
 import logging
 from typing import Any
 from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
 import healthy_heartrate_breathing.openai_realtime as rt_mod
-from healthy_heartrate_breathing.openai_realtime import OpenaiRealtimeHandler, _compute_response_cost
+from healthy_heartrate_breathing.openai_realtime import OpenaiRealtimeHandler, _to_json, _compute_response_cost
 from healthy_heartrate_breathing.tools.core_tools import ToolDependencies
 
 
@@ -55,8 +57,9 @@ async def test_start_up_retries_on_abrupt_close(monkeypatch: Any, caplog: Any) -
     class FakeConn:
         """Minimal realtime connection stub."""
 
-        def __init__(self, mode: str):
-            self._mode = mode
+        def __init__(self, events: list[Any]):
+            # Scripted iteration: exceptions are raised, other items yielded, then a clean end.
+            self._events = iter(events)
 
             class _Session:
                 async def update(self, **_kw: Any) -> None: return None
@@ -84,16 +87,18 @@ async def test_start_up_retries_on_abrupt_close(monkeypatch: Any, caplog: Any) -
 
         # Async iterator protocol
         def __aiter__(self) -> "FakeConn": return self
-        async def __anext__(self) -> None:
-            if self._mode == "raise_on_iter":
-                raise FakeCCE("abrupt close (simulated)")
-            raise StopAsyncIteration  # clean exit (no events)
+        async def __anext__(self) -> Any:
+            event = next(self._events, StopAsyncIteration())
+            if isinstance(event, BaseException):
+                raise event
+            return event
 
     class FakeRealtime:
         def connect(self, **_kw: Any) -> FakeConn:
             attempt_counter["n"] += 1
-            mode = "raise_on_iter" if attempt_counter["n"] == 1 else "clean"
-            return FakeConn(mode)
+            # first connection dies abruptly; the retry iterates cleanly with no events
+            events = [FakeCCE("abrupt close (simulated)")] if attempt_counter["n"] == 1 else []
+            return FakeConn(events)
 
     class FakeClient:
         def __init__(self, **_kw: Any) -> None: self.realtime = FakeRealtime()
@@ -117,6 +122,34 @@ async def test_start_up_retries_on_abrupt_close(monkeypatch: Any, caplog: Any) -
     assert len(warnings) == 1
 
 
+
+@pytest.mark.asyncio
+async def test_start_up_stops_retrying_after_shutdown_during_backoff(monkeypatch: Any) -> None:
+    """A shutdown requested while backing off ends start_up instead of reconnecting."""
+    FakeCCE = type("FakeCCE", (Exception,), {})
+    monkeypatch.setattr(rt_mod, "ConnectionClosedError", FakeCCE)
+    monkeypatch.setattr(rt_mod, "AsyncOpenAI", MagicMock())
+
+    deps = ToolDependencies(reachy_mini=MagicMock(), movement_manager=MagicMock())
+    handler = rt_mod.OpenaiRealtimeHandler(deps)
+    sessions = {"n": 0}
+
+    async def _failing_session() -> None:
+        sessions["n"] += 1
+        raise FakeCCE("abrupt close (simulated)")
+
+    async def _sleep_then_shutdown(*_a: Any, **_kw: Any) -> None:
+        await handler.shutdown()
+
+    monkeypatch.setattr(handler, "_run_realtime_session", _failing_session)
+    monkeypatch.setattr(asyncio, "sleep", _sleep_then_shutdown, raising=False)
+
+    await handler.start_up()
+
+    assert sessions["n"] == 1
+    assert handler.connection is None
+
+
 # ---- Cost calculation tests ----
 
 
@@ -171,3 +204,22 @@ def test_compute_response_cost(usage_kwargs: dict[str, Any], expect_positive: bo
         assert cost > 0
     else:
         assert cost == 0.0
+
+
+def test_compute_response_cost_applies_per_million_rates() -> None:
+    """Each token kind is billed at its own per-1M rate."""
+    usage = _make_usage(audio_in=1_000_000, text_in=500_000, image_in=200_000, audio_out=250_000, text_out=100_000)
+    expected = 32.0 + 0.5 * 4.0 + 0.2 * 5.0 + 0.25 * 64.0 + 0.1 * 16.0
+    assert _compute_response_cost(usage) == pytest.approx(expected)
+
+
+def test_to_json_round_trips_tool_results() -> None:
+    """Tool results serialize to JSON text with or without orjson installed."""
+    result = {"status": "ok", "hr": np.float64(69.5), "note": "bpm ♥", "big": 2**70, "targets": [{"cluster": 3}]}
+    assert json.loads(_to_json(result)) == {
+        "status": "ok",
+        "hr": 69.5,
+        "note": "bpm ♥",
+        "big": 2**70,
+        "targets": [{"cluster": 3}],
+    }